@@ -13,186 +13,843 @@ __version__ = (9, 4, 0)
 # 🔑 http://www.apache.org/licenses/LICENSE-2.0
 
 import asyncio
+import base64
+import struct
 import aiohttp
 import re
-import uuid
+import sys
+import math
+import time
+import bisect
+import heapq
 import inspect
+import random
+import uuid
 import logging
-from typing import Optional, Dict, List, Union, Tuple, Any
+import contextlib
+import contextvars
+from collections import OrderedDict, deque
+from typing import Optional, Dict, List, Union, Tuple, Any, Callable, Awaitable
 from urllib.parse import unquote
 
 import telethon
 from .. import loader, utils
 from herokutl.tl.functions.contacts import UnblockRequest
 
+logger = logging.getLogger(__name__)
+
+
+class FHetaError(Exception):
+    pass
+
+
+class FHetaUnavailable(FHetaError):
+    pass
+
+
+class FHetaRejected(FHetaError):
+    def __init__(self, status: int) -> None:
+        super().__init__(f"FHeta API rejected the request with status {status}")
+        self.status = status
+
+
+class FHetaCache:
+    def __init__(self, size: int = 128, ttl: float = 60.0, stale: float = 0.0) -> None:
+        self.size = size
+        self.ttl = ttl
+        self.stale = stale
+        self.data: 'OrderedDict[Any, Tuple[float, Any]]' = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def lookup(self, key: Any) -> Tuple[Any, bool]:
+        entry = self.data.get(key)
+        if entry is not None and time.monotonic() - entry[0] > self.ttl + self.stale:
+            del self.data[key]
+            self.evictions += 1
+            entry = None
+        if entry is None:
+            self.misses += 1
+            return None, False
+        self.data.move_to_end(key)
+        self.hits += 1
+        return entry[1], time.monotonic() - entry[0] <= self.ttl
+
+    def get(self, key: Any, default: Any = None) -> Any:
+        value, _ = self.lookup(key)
+        return default if value is None else value
+
+    def set(self, key: Any, value: Any) -> None:
+        self.data[key] = (time.monotonic(), value)
+        self.data.move_to_end(key)
+        while len(self.data) > self.size:
+            self.data.popitem(last=False)
+            self.evictions += 1
+
+    def peek(self, key: Any) -> Any:
+        entry = self.data.get(key)
+        return None if entry is None else entry[1]
+
+    def pop(self, key: Any, default: Any = None) -> Any:
+        entry = self.data.pop(key, None)
+        return default if entry is None else entry[1]
+
+    def evict(self, match: Callable[[Any], bool]) -> None:
+        for key in [key for key in self.data if match(key)]:
+            del self.data[key]
+            self.evictions += 1
+
+    def clear(self) -> None:
+        self.data.clear()
+
+    def reset(self) -> None:
+        self.hits = self.misses = self.evictions = 0
+
+    def stats(self) -> Dict[str, int]:
+        return {"size": len(self.data), "hits": self.hits, "misses": self.misses, "evictions": self.evictions}
+
+
+class FHetaMetrics:
+    def __init__(self, samples: int = 512) -> None:
+        self.samples = samples
+        self.reset()
+
+    def reset(self) -> None:
+        self.latencies: Dict[str, deque] = {}
+        self.counts: Dict[str, int] = {}
+        self.errors: Dict[str, int] = {}
+        self.sizes: Dict[str, int] = {}
+
+    def record(self, name: str, elapsed: float, size: int = 0) -> None:
+        self.latencies.setdefault(name, deque(maxlen=self.samples)).append(elapsed)
+        self.counts[name] = self.counts.get(name, 0) + 1
+        self.sizes[name] = self.sizes.get(name, 0) + size
+
+    def fail(self, name: str) -> None:
+        self.errors[name] = self.errors.get(name, 0) + 1
+
+    @contextlib.contextmanager
+    def measure(self, name: str) -> Any:
+        started = time.perf_counter()
+        try:
+            yield
+        except Exception:
+            self.fail(name)
+            raise
+        self.record(name, time.perf_counter() - started)
+
+    def percentile(self, name: str, q: float) -> float:
+        samples = sorted(self.latencies.get(name, ()))
+        return samples[min(len(samples) - 1, int(len(samples) * q))] if samples else 0.0
+
+    def report(self) -> Dict[str, Dict[str, float]]:
+        return {
+            name: {
+                "count": self.counts.get(name, 0),
+                "errors": self.errors.get(name, 0),
+                "bytes": self.sizes.get(name, 0),
+                "p50": self.percentile(name, 0.5),
+                "p95": self.percentile(name, 0.95),
+                "p99": self.percentile(name, 0.99)
+            }
+            for name in sorted({*self.counts, *self.errors})
+        }
+
+
+class FHetaLogs(logging.Handler):
+    scope: 'contextvars.ContextVar[Optional[List[logging.LogRecord]]]' = contextvars.ContextVar("fheta_install", default=None)
+
+    def emit(self, record: logging.LogRecord) -> None:
+        records = self.scope.get()
+        if records is not None:
+            records.append(record)
+
+    @contextlib.contextmanager
+    def capture(self) -> Any:
+        records: List[logging.LogRecord] = []
+        token = self.scope.set(records)
+        try:
+            yield records
+        finally:
+            self.scope.reset(token)
+
+    @staticmethod
+    def classify(records: List[logging.LogRecord]) -> str:
+        outcome = "error"
+        for record in records:
+            error = record.exc_info[1] if record.exc_info else None
+            kinds = {kind.__name__ for kind in type(error).__mro__} if error else set()
+            message = record.getMessage().lower()
+            if "CoreOverwriteError" in kinds or "overwrite" in message:
+                return "overwrite"
+            if kinds & {"ImportError", "ModuleNotFoundError"} or any(x in message for x in ("requir", "depend", "package")):
+                outcome = "dependency"
+        return outcome
+
+
+class FHetaInstaller:
+    def __init__(self, install: Callable[[str], Awaitable[str]], workers: int = 2) -> None:
+        self.install = install
+        self.slots = asyncio.Semaphore(workers)
+        self.jobs: Dict[str, asyncio.Future] = {}
+        self.states = FHetaCache(size=256, ttl=3600.0)
+
+    def submit(self, url: str) -> asyncio.Future:
+        job = self.jobs.get(url)
+        if job is None:
+            self.states.set(url, "queued")
+            job = self.jobs[url] = asyncio.ensure_future(self.run(url))
+        return asyncio.shield(job)
+
+    def status(self, url: str) -> Optional[str]:
+        return self.states.get(url)
+
+    async def run(self, url: str) -> str:
+        outcome = "error"
+        try:
+            async with self.slots:
+                self.states.set(url, "running")
+                outcome = await self.install(url)
+        finally:
+            self.states.set(url, outcome)
+            del self.jobs[url]
+        return outcome
+
+    def cancel(self) -> None:
+        for job in self.jobs.values():
+            job.cancel()
+
+
+class FHetaEditor:
+    def __init__(self, send: Callable[..., Awaitable[Any]]) -> None:
+        self.send = send
+        self.pending: Dict[Any, Tuple[Tuple[Any, ...], List[asyncio.Future]]] = {}
+        self.workers: Dict[Any, asyncio.Future] = {}
+
+    def submit(self, key: Any, edit: Tuple[Any, ...]) -> asyncio.Future:
+        waiter = asyncio.get_event_loop().create_future()
+        waiters = self.pending[key][1] if key in self.pending else []
+        self.pending[key] = (edit, waiters + [waiter])
+        if key not in self.workers:
+            self.workers[key] = asyncio.ensure_future(self.run(key))
+        return waiter
+
+    @staticmethod
+    def flood(error: Exception) -> Optional[float]:
+        if not any(name in type(error).__name__ for name in ("Flood", "RetryAfter")):
+            return None
+        delay = getattr(error, "retry_after", None) or getattr(error, "seconds", None)
+        return float(delay) if isinstance(delay, (int, float)) else 1.0
+
+    async def run(self, key: Any) -> None:
+        try:
+            while key in self.pending:
+                edit, waiters = self.pending.pop(key)
+                try:
+                    await self.send(*edit)
+                except Exception as e:
+                    delay = self.flood(e)
+                    if delay is None:
+                        for waiter in waiters:
+                            if not waiter.done():
+                                waiter.set_exception(e)
+                        continue
+                    await asyncio.sleep(delay)
+                    if key in self.pending:
+                        self.pending[key][1].extend(waiters)
+                    else:
+                        self.pending[key] = (edit, waiters)
+                    continue
+                for waiter in waiters:
+                    if not waiter.done():
+                        waiter.set_result(None)
+        finally:
+            del self.workers[key]
+
+    def cancel(self) -> None:
+        for worker in self.workers.values():
+            worker.cancel()
+        for _, waiters in self.pending.values():
+            for waiter in waiters:
+                waiter.cancel()
+        self.pending.clear()
+
+
+class FHetaCatalog:
+    weights = (3.0, 2.0, 1.5, 1.0)
+    k1 = 1.2
+    b = 0.75
+    depth = 256
 
-class FHetaAPI:
     def __init__(self) -> None:
+        self.records: Dict[str, Dict[str, Any]] = {}
+        self.postings: Dict[str, Dict[str, float]] = {}
+        self.sizes: Dict[str, List[int]] = {}
+        self.totals = [0] * len(self.weights)
+        self.averages = [1.0] * len(self.weights)
+        self.heads: Dict[str, List[Tuple[str, float]]] = {}
+        self.grams: Dict[str, set] = {}
+        self.commands: Dict[str, set] = {}
+        self.vocabulary: Optional[List[str]] = None
+        self.names: Optional[List[str]] = None
+        self.version: Any = None
+
+    @staticmethod
+    def words(text: Any) -> List[str]:
+        if isinstance(text, dict):
+            text = " ".join(str(value) for value in text.values())
+        return re.findall(r"\w+", str(text or "").lower())
+
+    @staticmethod
+    def trigrams(term: str) -> set:
+        padded = f" {term} "
+        return {padded[index:index + 3] for index in range(len(padded) - 2)}
+
+    def fields(self, data: Dict[str, Any]) -> List[List[str]]:
+        commands = []
+        for command in data.get("commands", []):
+            commands += self.words(command.get("name")) + self.words(command.get("description"))
+        return [self.words(data.get("name")), commands, self.words(data.get("author")), self.words(data.get("description"))]
+
+    def add(self, data: Dict[str, Any], fields: Optional[List[List[str]]] = None) -> None:
+        link = data.get("install", "")
+        if not link:
+            return
+        self.remove(link)
+        self.records[link] = data
+        fields = fields or self.fields(data)
+        sizes = self.sizes[link] = [len(words) for words in fields]
+        norms = [
+            weight / (1 - self.b + self.b * size / average)
+            for weight, size, average in zip(self.weights, sizes, self.averages)
+        ]
+        counts: Dict[str, float] = {}
+        for field, words in enumerate(fields):
+            self.totals[field] += len(words)
+            for word in words:
+                counts[word] = counts.get(word, 0.0) + norms[field]
+        for word, frequency in counts.items():
+            postings = self.postings.get(word)
+            if postings is None:
+                postings = self.postings[word] = {}
+                for gram in self.trigrams(word):
+                    self.grams.setdefault(gram, set()).add(word)
+                self.vocabulary = None
+            postings[link] = frequency / (self.k1 + frequency)
+            self.heads.pop(word, None)
+        for command in data.get("commands", []):
+            name = str(command.get("name", "")).lower()
+            if name:
+                self.commands.setdefault(name, set()).add(link)
+                self.names = None
+
+    def remove(self, link: str) -> None:
+        data = self.records.pop(link, None)
+        if data is None:
+            return
+        for field, size in enumerate(self.sizes.pop(link)):
+            self.totals[field] -= size
+        for word in {word for words in self.fields(data) for word in words}:
+            postings = self.postings.get(word)
+            if postings is None:
+                continue
+            postings.pop(link, None)
+            self.heads.pop(word, None)
+            if not postings:
+                del self.postings[word]
+                for gram in self.trigrams(word):
+                    self.grams[gram].discard(word)
+                    if not self.grams[gram]:
+                        del self.grams[gram]
+                self.vocabulary = None
+        for command in data.get("commands", []):
+            links = self.commands.get(str(command.get("name", "")).lower())
+            if links is not None:
+                links.discard(link)
+                if not links:
+                    del self.commands[str(command.get("name", "")).lower()]
+                    self.names = None
+
+    def apply(self, snapshot: Dict[str, Any], full: bool = False) -> None:
+        batch = [(data, self.fields(data)) for data in snapshot.get("modules", [])]
+        if full:
+            self.__init__()
+            if batch:
+                self.averages = [max(sum(len(fields[field]) for _, fields in batch) / len(batch), 1.0) for field in range(len(self.weights))]
+        for link in snapshot.get("removed", []):
+            self.remove(link)
+        for data, fields in batch:
+            self.add(data, fields)
+        if self.records:
+            self.averages = [max(total / len(self.records), 1.0) for total in self.totals]
+        self.vocabulary = sorted(self.postings)
+        self.names = sorted(self.commands)
+        self.version = snapshot.get("version", self.version)
+
+    def prefixed(self, terms: List[str], prefix: str, limit: int = 20) -> List[str]:
+        start = bisect.bisect_left(terms, prefix)
+        found = []
+        for term in terms[start:start + limit]:
+            if not term.startswith(prefix):
+                break
+            found.append(term)
+        return found
+
+    def head(self, term: str) -> Any:
+        postings = self.postings[term]
+        if len(postings) <= 4 * self.depth:
+            return postings.items()
+        head = self.heads.get(term)
+        if head is None:
+            head = self.heads[term] = heapq.nlargest(self.depth, postings.items(), key=lambda item: item[1])
+        return head
+
+    def expand(self, word: str, last: bool) -> Dict[str, float]:
+        expansions = {}
+        if word in self.postings:
+            expansions[word] = 1.0
+        if last and len(word) >= 2:
+            if self.vocabulary is None:
+                self.vocabulary = sorted(self.postings)
+            for term in self.prefixed(self.vocabulary, word, 10):
+                expansions.setdefault(term, 0.8)
+        if not expansions and len(word) >= 3:
+            grams = self.trigrams(word)
+            shared: Dict[str, int] = {}
+            for gram in grams:
+                for term in self.grams.get(gram, ()):
+                    shared[term] = shared.get(term, 0) + 1
+            for term in heapq.nlargest(5, shared, key=shared.get):
+                similarity = shared[term] / (len(grams) + len(term) - shared[term])
+                if similarity >= 0.25:
+                    expansions[term] = 0.7 * similarity
+        return expansions
+
+    def search(self, query: str, limit: int = 50) -> List[Dict[str, Any]]:
+        words = self.words(query)
+        if not words or not self.records:
+            return []
+            
+        total = len(self.records)
+        scores: Dict[str, float] = {}
+        plans = [self.expand(word, position == len(words) - 1) for position, word in enumerate(words)]
+        
+        for expansions in sorted(plans, key=lambda plan: sum(len(self.postings[term]) for term in plan)):
+            best: Dict[str, float] = {}
+            probe = len(scores) >= limit and sum(len(self.postings[term]) for term in expansions) > len(scores)
+            for term, weight in expansions.items():
+                postings = self.postings[term]
+                idf = weight * math.log(1 + (total - len(postings) + 0.5) / (len(postings) + 0.5))
+                if probe:
+                    for link in scores:
+                        frequency = postings.get(link)
+                        if frequency and idf * frequency > best.get(link, 0.0):
+                            best[link] = idf * frequency
+                elif not best:
+                    best = {link: idf * frequency for link, frequency in self.head(term)}
+                else:
+                    for link, frequency in self.head(term):
+                        if idf * frequency > best.get(link, 0.0):
+                            best[link] = idf * frequency
+            if not scores:
+                scores = best
+                continue
+            for link, score in best.items():
+                scores[link] = scores.get(link, 0.0) + score
+                
+        if self.names is None:
+            self.names = sorted(self.commands)
+        for name in self.prefixed(self.names, words[-1]):
+            for link in self.commands[name]:
+                if link in scores:
+                    scores[link] += 1.0 if name == words[-1] else 0.5
+                    
+        ranked = heapq.nlargest(limit, scores, key=scores.get)
+        ranked.sort(key=lambda link: (scores[link], self.records[link].get("likes", 0)), reverse=True)
+        return [self.records[link] for link in ranked]
+
+
+class FHetaBreaker:
+    def __init__(self, threshold: int = 5, cooldown: float = 30.0) -> None:
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.failures = 0
+        self.opened: Optional[float] = None
+
+    def allow(self) -> bool:
+        if self.opened is None:
+            return True
+        if time.monotonic() - self.opened < self.cooldown:
+            return False
+        self.opened = time.monotonic()
+        return True
+
+    def success(self) -> None:
+        self.failures = 0
+        self.opened = None
+
+    def failure(self) -> None:
+        self.failures += 1
+        if self.failures >= self.threshold:
+            self.opened = time.monotonic()
+
+
+class FHetaAPI:
+    def __init__(self, limit: int = 8, keepalive: float = 75.0, dns_ttl: int = 600, timeout: float = 10.0, retries: int = 2, backoff: float = 0.25, hedging: bool = True, metrics: Optional[FHetaMetrics] = None, base: str = "https://api.fixyres.com/") -> None:
+        self.base = base.rstrip("/") + "/"
         self.token: Optional[str] = None
         self.session: Optional[aiohttp.ClientSession] = None
+        self.limit = limit
+        self.keepalive = keepalive
+        self.dns_ttl = dns_ttl
+        self.timeout = aiohttp.ClientTimeout(total=timeout)
+        self.retries = retries
+        self.backoff = backoff
+        self.hedging = hedging
+        self.breaker = FHetaBreaker()
+        self.metrics = metrics or FHetaMetrics()
+        self.created = 0
+        self.reused = 0
 
     async def connect(self) -> aiohttp.ClientSession:
         if self.session is None or self.session.closed:
-            self.session = aiohttp.ClientSession()
+            tracing = aiohttp.TraceConfig()
+            tracing.on_connection_create_end.append(self.on_create)
+            tracing.on_connection_reuseconn.append(self.on_reuse)
+            self.session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(
+                    limit_per_host=self.limit,
+                    keepalive_timeout=self.keepalive,
+                    ttl_dns_cache=self.dns_ttl
+                ),
+                timeout=self.timeout,
+                trace_configs=[tracing]
+            )
         return self.session
 
-    async def fetch(self, path: str, **params: Any) -> Dict[str, Any]:
+    async def on_create(self, session: aiohttp.ClientSession, context: Any, params: Any) -> None:
+        self.created += 1
+
+    async def on_reuse(self, session: aiohttp.ClientSession, context: Any, params: Any) -> None:
+        self.reused += 1
+
+    async def warmup(self) -> None:
         session = await self.connect()
         try:
-            async with session.get(
-                f"https://api.fixyres.com/{path}",
-                params=params,
-                headers={"Authorization": self.token},
-                timeout=aiohttp.ClientTimeout(total=10)
-            ) as response:
-                if response.status == 200:
-                    return await response.json()
-                return {}
+            async with session.head(self.base):
+                pass
         except Exception:
-            return {}
+            pass
 
-    async def send(self, path: str, payload: Optional[Dict[str, Any]] = None, **params: Any) -> Dict[str, Any]:
+    def stats(self) -> Dict[str, int]:
+        connector = self.session.connector if self.session and not self.session.closed else None
+        idle = sum(len(conns) for conns in getattr(connector, "_conns", {}).values())
+        active = len(getattr(connector, "_acquired", ()))
+        return {"open": idle + active, "idle": idle, "active": active, "created": self.created, "reused": self.reused}
+
+    def hedge(self, endpoint: str) -> Optional[float]:
+        if not self.hedging or len(self.metrics.latencies.get(endpoint, ())) < 20:
+            return None
+        return self.metrics.percentile(endpoint, 0.95)
+
+    async def request(self, method: str, path: str, payload: Any = None, params: Optional[Dict[str, Any]] = None) -> Any:
+        endpoint = f"api/{path.split('/', 1)[0]}"
+        if not self.breaker.allow():
+            self.metrics.fail(endpoint)
+            raise FHetaUnavailable("FHeta API circuit is open")
         session = await self.connect()
+        started = time.perf_counter()
         try:
-            async with session.post(
-                f"https://api.fixyres.com/{path}",
+            async with session.request(
+                method,
+                f"{self.base}{path}",
                 json=payload,
-                params=params,
-                headers={"Authorization": self.token},
-                timeout=aiohttp.ClientTimeout(total=10)
+                params={key: value for key, value in (params or {}).items() if value is not None},
+                headers={"Authorization": self.token} if self.token else None
             ) as response:
+                if response.status == 429 or response.status >= 500:
+                    raise FHetaUnavailable(f"FHeta API answered with status {response.status}")
+                if response.status != 200:
+                    raise FHetaRejected(response.status)
+                size = len(await response.read())
+                result = await response.json()
+        except FHetaRejected:
+            self.breaker.success()
+            self.metrics.fail(endpoint)
+            raise
+        except FHetaUnavailable:
+            self.breaker.failure()
+            self.metrics.fail(endpoint)
+            raise
+        except (aiohttp.ClientError, asyncio.TimeoutError, ValueError) as e:
+            self.breaker.failure()
+            self.metrics.fail(endpoint)
+            raise FHetaUnavailable(str(e) or type(e).__name__) from e
+        self.breaker.success()
+        self.metrics.record(endpoint, time.perf_counter() - started, size)
+        return result
+
+    async def hedged(self, path: str, params: Dict[str, Any]) -> Any:
+        delay = self.hedge(f"api/{path.split('/', 1)[0]}")
+        attempts = [asyncio.ensure_future(self.request("GET", path, params=params))]
+        try:
+            if delay is None:
+                return await attempts[0]
+            done, _ = await asyncio.wait(attempts, timeout=delay)
+            if not done:
+                attempts.append(asyncio.ensure_future(self.request("GET", path, params=params)))
+            pending = set(attempts)
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for attempt in done:
+                    if attempt.exception() is None:
+                        return attempt.result()
+            return attempts[-1].result()
+        finally:
+            for attempt in attempts:
+                if not attempt.done():
+                    attempt.cancel()
+
+    async def fetch(self, path: str, **params: Any) -> Any:
+        started = time.monotonic()
+        for attempt in range(self.retries + 1):
+            try:
+                return await self.hedged(path, params)
+            except FHetaUnavailable:
+                delay = random.uniform(0, self.backoff * 2 ** attempt)
+                if attempt == self.retries or self.breaker.opened is not None or time.monotonic() - started + delay > self.timeout.total:
+                    raise
+                await asyncio.sleep(delay)
+
+    async def raw(self, url: str) -> str:
+        session = await self.connect()
+        try:
+            async with session.get(url) as response:
                 if response.status == 200:
-                    return await response.json()
-                return {}
+                    return await response.text()
+                return ""
         except Exception:
-            return {}
+            return ""
+
+    async def send(self, path: str, payload: Any = None, **params: Any) -> Any:
+        return await self.request("POST", path, payload, params)
+
+
+class FHetaModule:
+    __slots__ = ("data", "lang", "name", "author", "label", "version", "text", "summary", "_description", "_commands", "_placeholders")
+
+    def __init__(self, data: Dict[str, Any], lang: str) -> None:
+        self.data = data
+        self.lang = lang
+        self.name = utils.escape_html(data.get("name", ""))
+        self.author = utils.escape_html(data.get("author", "???"))
+        self.label = f"{data.get('name', 'Unknown')} by {data.get('author', '???')}"
+        self.version = data.get("version", "?.?.?")
+        
+        description = data.get("description", "")
+        if isinstance(description, dict):
+            description = description.get(lang) or description.get("doc") or next(iter(description.values()), "")
+        self.text = str(description)
+        self.summary = utils.escape_html(self.text[:250] + ("..." if len(self.text) > 250 else ""))
+        
+        self._description = None
+        self._commands = None
+        self._placeholders = None
+
+    @property
+    def description(self) -> str:
+        if self._description is None:
+            self._description = utils.escape_html(self.text)
+        return self._description
+
+    @property
+    def commands(self) -> Tuple[Tuple[bool, str, str, int], ...]:
+        if self._commands is None:
+            self._commands = self.rows(self.data.get("commands", []), self.lang)
+        return self._commands
+
+    @property
+    def placeholders(self) -> Tuple[Tuple[bool, str, str, int], ...]:
+        if self._placeholders is None:
+            self._placeholders = self.rows(self.data.get("placeholders", []), self.lang)
+        return self._placeholders
+
+    @staticmethod
+    def rows(items: List[Dict[str, Any]], lang: str) -> Tuple[Tuple[bool, str, str, int], ...]:
+        rows = []
+        for item in items:
+            description = item.get("description", {})
+            if isinstance(description, dict):
+                description = description.get(lang) or description.get("doc") or ""
+            description = utils.escape_html(description).split('\n')[0].rstrip() if description else ""
+            name = utils.escape_html(item.get("name", ""))
+            rows.append((bool(item.get("inline")), name, description, len(name) + (len(description) + 1 if description else 0)))
+        return tuple(rows)
 
 
 class FHetaUI:
+    tags = re.compile(r'<[^>]+>')
+
     def __init__(self, main: 'FHeta') -> None:
         self.main = main
+        self.cards = FHetaCache(size=256, ttl=600.0)
+        self.theme = None
 
     def emoji(self, key: str) -> str:
         return self.main.THEMES[self.main.config["theme"]][key]
 
-    def format(self, data: Dict[str, Any], query: str = "", index: int = 1, total: int = 1, inline: bool = False) -> str:
-        version = data.get("version", "?.?.?")
+    def record(self, data: Dict[str, Any], set_id: Optional[str] = None, index: int = 0) -> FHetaModule:
+        lang = self.main.strings["lang"]
+        parent, _, view = (set_id or "").partition(":")
+        saved = self.main.fheta_cache.peek(parent) if set_id else None
+        position = int(view) if view else index
+        if not saved or not 0 <= position < len(saved["mods"]) or saved["mods"][position] is not data:
+            return FHetaModule(data, lang)
+        records = saved.setdefault("records", {}).setdefault(lang, {})
+        record = records.get(position)
+        if record is None:
+            record = records[position] = FHetaModule(data, lang)
+        return record
+
+    def format(self, data: Dict[str, Any], query: str = "", index: int = 1, total: int = 1, inline: bool = False, record: Optional[FHetaModule] = None) -> str:
+        record = record or FHetaModule(data, self.main.strings["lang"])
         limit = 3700
-        name = utils.escape_html(data.get("name", ""))
-        author = utils.escape_html(data.get("author", "???"))
         
-        text = f"{self.emoji('module')} <code>{name}</code> <b>{self.main.strings['author']}</b> <code>{author}</code>"
-        if version != "?.?.?":
-            text += f" (<code>v{version}</code>)"
+        text = f"{self.emoji('module')} <code>{record.name}</code> <b>{self.main.strings['author']}</b> <code>{record.author}</code>"
+        if record.version != "?.?.?":
+            text += f" (<code>v{record.version}</code>)"
 
-        description = data.get("description")
-        if description:
-            if isinstance(description, dict):
-                string = description.get(self.main.strings["lang"]) or description.get("doc") or next(iter(description.values()), "")
-            else:
-                string = description
-            text += f"\n\n{self.emoji('description')} <b>{self.main.strings['description']}:</b>\n<blockquote expandable>{utils.escape_html(str(string))}</blockquote>"
+        if data.get("description"):
+            text += f"\n\n{self.emoji('description')} <b>{self.main.strings['description']}:</b>\n<blockquote expandable>{record.description}</blockquote>"
 
-        text += self.render(data.get("commands", []), "cmd", limit - len(re.sub(r'<[^>]+>', '', text)))
-        text += self.render(data.get("placeholders", []), "ph", limit - len(re.sub(r'<[^>]+>', '', text)))
+        length = self.visible(text)
+        section, size = self.section(record.commands, "cmd", limit - length)
+        text += section
+        text += self.section(record.placeholders, "ph", limit - length - size)[0]
         
         return text
 
+    def card(self, data: Dict[str, Any], set_id: str, index: int, total: int, query: str = "") -> Tuple[str, List[List[Dict[str, Any]]]]:
+        if self.theme != self.main.config["theme"]:
+            self.cards.clear()
+            self.theme = self.main.config["theme"]
+        stats = self.main.counts(data)
+        key = (data.get("install", ""), data.get("version"), set_id, index, total, self.main.strings["lang"], self.main.get_prefix(), stats["likes"], stats["dislikes"])
+        card = self.cards.get(key)
+        if card is None:
+            with self.main.metrics.measure("ui/format"):
+                card = self.format(data, query, index + 1, total, record=self.record(data, set_id, index)), self.buttons(data, set_id, index, total, query)
+            self.cards.set(key, card)
+        return card
+
+    def invalidate(self, link: str) -> None:
+        self.cards.evict(lambda key: key[0] == link)
+
+    def visible(self, text: str) -> int:
+        return len(self.tags.sub('', text))
+
     def render(self, items: List[Dict[str, Any]], kind: str, limit: int) -> str:
-        if not items:
-            return ""
+        return self.section(FHetaModule.rows(items, self.main.strings["lang"]), kind, limit)[0]
+
+    def section(self, rows: Tuple[Tuple[bool, str, str, int], ...], kind: str, limit: int) -> Tuple[str, int]:
+        if not rows:
+            return "", 0
             
         lines = []
-        language = self.main.strings["lang"]
+        size = 0
         
         title = "commands" if kind == "cmd" else "placeholders"
         more = "morecommands" if kind == "cmd" else "moreplaceholders"
+        mention = '@' + self.main.inline.bot_username + ' '
+        prefix = self.main.get_prefix()
         
-        for index, item in enumerate(items):
-            description = item.get("description", {})
-            if isinstance(description, dict):
-                description = description.get(language) or description.get("doc") or ""
-            
-            description = utils.escape_html(description).split('\n')[0] if description else ""
-            name = utils.escape_html(item.get("name", ""))
-            
-            if item.get('inline'):
-                character = '@' + self.main.inline.bot_username + ' '
+        for index, (inline, name, description, width) in enumerate(rows):
+            if inline:
+                character = mention
                 display_name = name
             elif kind == "ph":
                 character = ""
                 display_name = f"{{{name}}}"
+                width += 2
             else:
-                character = self.main.get_prefix()
+                character = prefix
                 display_name = name
                 
-            row = f"<code>{character}{display_name}</code> {description}".strip()
+            row = f"<code>{character}{display_name}</code> {description}" if description else f"<code>{character}{display_name}</code>"
+            width += self.visible(character) + bool(lines)
             
-            extra = f"<i>{self.main.strings[more].format(remaining=len(items) - index)}</i>"
-            test = "\n".join(lines + [row, extra])
+            extra = f"<i>{self.main.strings[more].format(remaining=len(rows) - index)}</i>"
+            tail = 1 + self.visible(extra)
             
-            if len(re.sub(r'<[^>]+>', '', test)) > limit and index > 0:
+            if size + width + tail > limit and index > 0:
                 lines.append(extra)
+                size += tail
                 break
                 
             lines.append(row)
+            size += width
             
-        return f"\n\n{self.emoji('command' if kind == 'cmd' else 'placeholder')} <b>{self.main.strings[title]}:</b>\n<blockquote expandable>{chr(10).join(lines)}</blockquote>"
+        header = f"\n\n{self.emoji('command' if kind == 'cmd' else 'placeholder')} <b>{self.main.strings[title]}:</b>\n<blockquote expandable>"
+        return f"{header}{chr(10).join(lines)}</blockquote>", self.visible(header) + size
 
-    def buttons(self, link: str, stats: Dict[str, Any], index: int, modules: Optional[List[Dict[str, Any]]] = None, query: str = "") -> List[List[Dict[str, Any]]]:
-        buttons = []
+    def url(self, link: str) -> str:
         decoded = unquote(link.replace('%20', '___SPACE___')).replace('___SPACE___', '%20')
-        url = decoded[4:] if decoded.startswith('dlm ') else decoded
+        return decoded[4:] if decoded.startswith('dlm ') else decoded
+
+    def buttons(self, data: Dict[str, Any], set_id: str, index: int, total: int, query: str = "", stats: Optional[Dict[str, int]] = None) -> List[List[Dict[str, Any]]]:
+        buttons = []
+        url = self.url(data.get("install", ""))
         
         if query:
             buttons.append([
                 {"text": self.main.strings["query"], "copy": query},
-                {"text": self.main.strings["install"], "callback": self.main.install, "args": (url, index, modules, query)},
+                {"text": self.main.strings["install"], "callback": self.main.install, "args": (set_id, index)},
                 {"text": self.main.strings["code"], "url": url}
             ])
             
+        stats = stats or self.main.counts(data)
         buttons.append([
-            {"text": f"↑ {stats.get('likes', 0)}", "callback": self.main.rate, "args": (link, "like", index, modules, query)},
-            {"text": f"↓ {stats.get('dislikes', 0)}", "callback": self.main.rate, "args": (link, "dislike", index, modules, query)}
+            {"text": f"↑ {stats['likes']}", "callback": self.main.rate, "args": (set_id, index, "like")},
+            {"text": f"↓ {stats['dislikes']}", "callback": self.main.rate, "args": (set_id, index, "dislike")}
         ])
         
-        if modules and len(modules) > 1:
-            count = {"text": self.main.strings["counter"].format(idx=index+1, total=len(modules)), "callback": self.main.show, "args": (index, modules, query)}
+        if total > 1:
+            count = {"text": self.main.strings["counter"].format(idx=index+1, total=total), "callback": self.main.show, "args": (set_id, index)}
             buttons[-1].insert(1, count)
             
             navigation = []
             if index > 0:
-                navigation.append({"text": "←", "callback": self.main.navigate, "args": (index - 1, modules, query)})
-            if index < len(modules) - 1:
-                navigation.append({"text": "→", "callback": self.main.navigate, "args": (index + 1, modules, query)})
+                navigation.append({"text": "←", "callback": self.main.navigate, "args": (set_id, index - 1)})
+            if index < total - 1:
+                navigation.append({"text": "→", "callback": self.main.navigate, "args": (set_id, index + 1)})
                 
             if navigation:
                 buttons.append(navigation)
                 
         return buttons
 
-    def pagination(self, modules: List[Dict[str, Any]], query: str, page: int = 0, current: int = 0) -> List[List[Dict[str, Any]]]:
+    def pagination(self, set_id: str, modules: List[Dict[str, Any]], page: int = 0, current: int = 0) -> List[List[Dict[str, Any]]]:
         buttons = []
         start = page * 8
         end = min(start + 8, len(modules))
         
         for index in range(start, end):
-            name = modules[index].get('name', 'Unknown')
-            author = modules[index].get('author', '???')
             buttons.append([
-                {"text": f"{index + 1}. {name} by {author}", "callback": self.main.navigate, "args": (index, modules, query)}
+                {"text": f"{index + 1}. {self.record(modules[index], set_id, index).label}", "callback": self.main.navigate, "args": (set_id, index)}
             ])
             
         navigation = []
         if page > 0:
-            navigation.append({"text": "←", "callback": self.main.page, "args": (page - 1, modules, query, current)})
+            navigation.append({"text": "←", "callback": self.main.page, "args": (set_id, page - 1, current)})
         if page < (len(modules) + 7) // 8 - 1:
-            navigation.append({"text": "→", "callback": self.main.page, "args": (page + 1, modules, query, current)})
+            navigation.append({"text": "→", "callback": self.main.page, "args": (set_id, page + 1, current)})
             
         if navigation:
             buttons.append(navigation)
             
-        buttons.append([{"text": "✘", "callback": self.main.navigate, "args": (current, modules, query)}])
+        buttons.append([{"text": self.main.strings["installall"], "callback": self.main.install_all, "args": (set_id, current)}])
+        buttons.append([{"text": "✘", "callback": self.main.navigate, "args": (set_id, current)}])
         return buttons
 
 
@@ -231,7 +888,22 @@ class FHeta(loader.Module):
         "docdevs": "Use only modules from official Heroku developers when searching?",
         "doctheme": "Theme for emojis.",
         "channel": "This is the channel with all updates in FHeta!",
-        "install_via_fheta": "Enable Install via FHeta?"
+        "install_via_fheta": "Enable Install via FHeta?",
+        "docdebounce": "Delay in seconds before an inline search is sent, so fast typing only searches the final query.",
+        "expired": "✘ These search results have expired, please search again.",
+        "docrevalidate": "How many hours a validated token is trusted before it is checked again.",
+        "installall": "Install all",
+        "bulk": "Installing {count} modules...",
+        "bulkdone": "Installed {ok} of {total} modules in {time}s.",
+        "bulkdeps": "Dependencies: {count} packages, {time}s.",
+        "nolinks": "You didn't enter module links, example: {prefix}fhinstall link1 link2",
+        "unavailable": "FHeta is temporarily unavailable, please try again later.",
+        "metrics": "FHeta statistics",
+        "metricsreset": "FHeta statistics have been reset.",
+        "installing": "⏳ This module is already being installed, please wait.",
+        "bulkdepsfail": "✘ Failed to install dependencies: {packages}.",
+        "confirmall": "Install all {count} modules from these results? Each of them is third-party code that will run in your userbot:",
+        "confirm": "✔ Install"
     }
     
     strings_ru = {
@@ -265,7 +937,22 @@ class FHeta(loader.Module):
         "docdevs": "Использовать только модули от официальных разработчиков Heroku при поиске?",
         "doctheme": "Тема для эмодзи.",
         "channel": "Это канал со всеми обновлениями в FHeta!",
-        "install_via_fheta": "Включить Install via FHeta?"
+        "install_via_fheta": "Включить Install via FHeta?",
+        "docdebounce": "Задержка в секундах перед отправкой инлайн-поиска, чтобы при быстром вводе искался только итоговый запрос.",
+        "expired": "✘ Результаты поиска устарели, выполните поиск заново.",
+        "docrevalidate": "Сколько часов проверенный токен считается действительным до повторной проверки.",
+        "installall": "Установить все",
+        "bulk": "Установка {count} модулей...",
+        "bulkdone": "Установлено {ok} из {total} модулей за {time}с.",
+        "bulkdeps": "Зависимости: {count} пакетов, {time}с.",
+        "nolinks": "Вы не ввели ссылки на модули, пример: {prefix}fhinstall ссылка1 ссылка2",
+        "unavailable": "FHeta временно недоступна, попробуйте позже.",
+        "metrics": "Статистика FHeta",
+        "metricsreset": "Статистика FHeta сброшена.",
+        "installing": "⏳ Этот модуль уже устанавливается, подождите.",
+        "bulkdepsfail": "✘ Не удалось установить зависимости: {packages}.",
+        "confirmall": "Установить все {count} модулей из этих результатов? Каждый из них — сторонний код, который будет выполняться в вашем юзерботе:",
+        "confirm": "✔ Установить"
     }
     
     strings_ua = {
@@ -299,7 +986,22 @@ class FHeta(loader.Module):
         "docdevs": "Використовувати тільки модулі від офіційних розробників Heroku при пошуку?",
         "doctheme": "Тема для емодзі.",
         "channel": "Це канал з усіма оновленнями в FHeta!",
-        "install_via_fheta": "Увімкнути Install via FHeta?"
+        "install_via_fheta": "Увімкнути Install via FHeta?",
+        "docdebounce": "Затримка в секундах перед надсиланням інлайн-пошуку, щоб при швидкому введенні шукався лише остаточний запит.",
+        "expired": "✘ Результати пошуку застаріли, виконайте пошук знову.",
+        "docrevalidate": "Скільки годин перевірений токен вважається дійсним до повторної перевірки.",
+        "installall": "Встановити всі",
+        "bulk": "Встановлення {count} модулів...",
+        "bulkdone": "Встановлено {ok} з {total} модулів за {time}с.",
+        "bulkdeps": "Залежності: {count} пакетів, {time}с.",
+        "nolinks": "Ви не ввели посилання на модулі, приклад: {prefix}fhinstall посилання1 посилання2",
+        "unavailable": "FHeta тимчасово недоступна, спробуйте пізніше.",
+        "metrics": "Статистика FHeta",
+        "metricsreset": "Статистику FHeta скинуто.",
+        "installing": "⏳ Цей модуль вже встановлюється, зачекайте.",
+        "bulkdepsfail": "✘ Не вдалося встановити залежності: {packages}.",
+        "confirmall": "Встановити всі {count} модулів із цих результатів? Кожен із них — сторонній код, який виконуватиметься у вашому юзерботі:",
+        "confirm": "✔ Встановити"
     }
     
     strings_kz = {
@@ -333,7 +1035,22 @@ class FHeta(loader.Module):
         "docdevs": "Іздеу кезінде тек ресми Heroku әзірлеушілерінің модульдерін пайдалану керек пе?",
         "doctheme": "Эмодзилер үшін тақырып.",
         "channel": "Бұл FHeta-дағы барлық жаңартулары бар арна!",
-        "install_via_fheta": "Install via FHeta қосу керек пе?"
+        "install_via_fheta": "Install via FHeta қосу керек пе?",
+        "docdebounce": "Инлайн-іздеу жіберілер алдындағы секундпен кідіріс, жылдам тергенде тек соңғы сұрау ізделеді.",
+        "expired": "✘ Іздеу нәтижелерінің мерзімі өтті, қайта іздеңіз.",
+        "docrevalidate": "Тексерілген токен қайта тексерілгенге дейін неше сағат жарамды болып саналады.",
+        "installall": "Барлығын орнату",
+        "bulk": "{count} модуль орнатылуда...",
+        "bulkdone": "{total} модульдің {ok} модулі {time}с ішінде орнатылды.",
+        "bulkdeps": "Тәуелділіктер: {count} пакет, {time}с.",
+        "nolinks": "Сіз модуль сілтемелерін енгізбедіңіз, мысал: {prefix}fhinstall сілтеме1 сілтеме2",
+        "unavailable": "FHeta уақытша қолжетімсіз, кейінірек қайталап көріңіз.",
+        "metrics": "FHeta статистикасы",
+        "metricsreset": "FHeta статистикасы тазартылды.",
+        "installing": "⏳ Бұл модуль қазір орнатылуда, күте тұрыңыз.",
+        "bulkdepsfail": "✘ Тәуелділіктерді орнату сәтсіз аяқталды: {packages}.",
+        "confirmall": "Осы нәтижелердегі барлық {count} модульді орнату керек пе? Олардың әрқайсысы юзерботыңызда орындалатын бөгде код:",
+        "confirm": "✔ Орнату"
     }
     
     strings_uz = {
@@ -367,7 +1084,22 @@ class FHeta(loader.Module):
         "docdevs": "Qidiruv paytida faqat rasmiy Heroku ishlab chiquvchilarining modullaridan foydalanish kerakmi?",
         "doctheme": "Emojilar uchun mavзу.",
         "channel": "Bu FHeta-dagi barcha yangilanishlari bo'lgan kanal!",
-        "install_via_fheta": "Install via FHeta yoqilsinmi?"
+        "install_via_fheta": "Install via FHeta yoqilsinmi?",
+        "docdebounce": "Inline qidiruv yuborilishidan oldingi kechikish (soniyalarda), tez yozganda faqat oxirgi so'rov qidiriladi.",
+        "expired": "✘ Qidiruv natijalari eskirgan, qaytadan qidiring.",
+        "docrevalidate": "Tekshirilgan token qayta tekshirilgunga qadar necha soat haqiqiy hisoblanadi.",
+        "installall": "Hammasini o'rnatish",
+        "bulk": "{count} ta modul o'rnatilmoqda...",
+        "bulkdone": "{total} ta moduldan {ok} tasi {time}s ichida o'rnatildi.",
+        "bulkdeps": "Bog'liqliklar: {count} ta paket, {time}s.",
+        "nolinks": "Siz modul havolalarini kiritmadingiz, misol: {prefix}fhinstall havola1 havola2",
+        "unavailable": "FHeta vaqtincha mavjud emas, keyinroq qayta urinib ko'ring.",
+        "metrics": "FHeta statistikasi",
+        "metricsreset": "FHeta statistikasi tozalandi.",
+        "installing": "⏳ Bu modul allaqachon o'rnatilmoqda, kuting.",
+        "bulkdepsfail": "✘ Bog'liqliklarni o'rnatib bo'lmadi: {packages}.",
+        "confirmall": "Ushbu natijalardagi barcha {count} ta modul o'rnatilsinmi? Ularning har biri userbotingizda ishlaydigan begona koddir:",
+        "confirm": "✔ O'rnatish"
     }
     
     strings_fr = {
@@ -401,7 +1133,22 @@ class FHeta(loader.Module):
         "docdevs": "Utiliser uniquement les modules des développeurs Heroku officiels lors de la recherche?",
         "doctheme": "Thème pour les emojis.",
         "channel": "Voici le canal avec toutes les mises à jour dans FHeta!",
-        "install_via_fheta": "Activer Install via FHeta ?"
+        "install_via_fheta": "Activer Install via FHeta ?",
+        "docdebounce": "Délai en secondes avant l'envoi d'une recherche inline, pour que la saisie rapide ne recherche que la requête finale.",
+        "expired": "✘ Ces résultats de recherche ont expiré, veuillez relancer la recherche.",
+        "docrevalidate": "Nombre d'heures pendant lesquelles un jeton validé est considéré comme valide avant d'être revérifié.",
+        "installall": "Tout installer",
+        "bulk": "Installation de {count} modules...",
+        "bulkdone": "{ok} modules sur {total} installés en {time}s.",
+        "bulkdeps": "Dépendances : {count} paquets, {time}s.",
+        "nolinks": "Vous n'avez pas entré de liens de modules, exemple: {prefix}fhinstall lien1 lien2",
+        "unavailable": "FHeta est temporairement indisponible, veuillez réessayer plus tard.",
+        "metrics": "Statistiques de FHeta",
+        "metricsreset": "Les statistiques de FHeta ont été réinitialisées.",
+        "installing": "⏳ Ce module est déjà en cours d'installation, veuillez patienter.",
+        "bulkdepsfail": "✘ Échec de l'installation des dépendances : {packages}.",
+        "confirmall": "Installer les {count} modules de ces résultats ? Chacun est du code tiers qui s'exécutera dans votre userbot :",
+        "confirm": "✔ Installer"
     }
     
     strings_de = {
@@ -435,7 +1182,22 @@ class FHeta(loader.Module):
         "docdevs": "Nur Module von offiziellen Heroku-Entwicklern bei की खोज में उपयोग करें?",
         "doctheme": "Theма für эмодзи.",
         "channel": "Dies ist der Kanal with all updates in FHeta!",
-        "install_via_fheta": "Install via FHeta aktivieren?"
+        "install_via_fheta": "Install via FHeta aktivieren?",
+        "docdebounce": "Verzögerung in Sekunden vor dem Senden einer Inline-Suche, damit beim schnellen Tippen nur die endgültige Anfrage gesucht wird.",
+        "expired": "✘ Diese Suchergebnisse sind abgelaufen, bitte suchen Sie erneut.",
+        "docrevalidate": "Wie viele Stunden ein geprüftes Token als gültig gilt, bevor es erneut geprüft wird.",
+        "installall": "Alle installieren",
+        "bulk": "{count} Module werden installiert...",
+        "bulkdone": "{ok} von {total} Modulen in {time}s installiert.",
+        "bulkdeps": "Abhängigkeiten: {count} Pakete, {time}s.",
+        "nolinks": "Sie haben keine Modul-Links eingegeben, Beispiel: {prefix}fhinstall link1 link2",
+        "unavailable": "FHeta ist vorübergehend nicht erreichbar, bitte versuche es später erneut.",
+        "metrics": "FHeta-Statistiken",
+        "metricsreset": "Die FHeta-Statistiken wurden zurückgesetzt.",
+        "installing": "⏳ Dieses Modul wird bereits installiert, bitte warten.",
+        "bulkdepsfail": "✘ Abhängigkeiten konnten nicht installiert werden: {packages}.",
+        "confirmall": "Alle {count} Module aus diesen Ergebnissen installieren? Jedes davon ist Fremdcode, der in deinem Userbot ausgeführt wird:",
+        "confirm": "✔ Installieren"
     }
     
     strings_jp = {
@@ -469,7 +1231,22 @@ class FHeta(loader.Module):
         "docdevs": "検索時に公式Heroku開発者のモジュールのみを使用しますか？",
         "doctheme": "絵文字のテーマ。",
         "channel": "これはFHetaのすべての更新を含むチャンネルです！",
-        "install_via_fheta": "Install via FHetaを有効にしますか？"
+        "install_via_fheta": "Install via FHetaを有効にしますか？",
+        "docdebounce": "インライン検索を送信するまでの遅延（秒）。素早く入力した場合、最後のクエリのみ検索されます。",
+        "expired": "✘ 検索結果の有効期限が切れました。もう一度検索してください。",
+        "docrevalidate": "検証済みトークンを再確認するまで有効とみなす時間（時間単位）。",
+        "installall": "すべてインストール",
+        "bulk": "{count} 個のモジュールをインストール中...",
+        "bulkdone": "{total} 個中 {ok} 個のモジュールを {time} 秒でインストールしました。",
+        "bulkdeps": "依存関係: {count} 個のパッケージ, {time} 秒。",
+        "nolinks": "モジュールのリンクを入力していません、例: {prefix}fhinstall リンク1 リンク2",
+        "unavailable": "FHetaは一時的に利用できません。後でもう一度お試しください。",
+        "metrics": "FHetaの統計",
+        "metricsreset": "FHetaの統計をリセットしました。",
+        "installing": "⏳ このモジュールは既にインストール中です。お待ちください。",
+        "bulkdepsfail": "✘ 依存関係のインストールに失敗しました: {packages}。",
+        "confirmall": "この結果の{count}個のモジュールをすべてインストールしますか？いずれもユーザーボット内で実行されるサードパーティのコードです：",
+        "confirm": "✔ インストール"
     }
     
     THEMES = {
@@ -531,7 +1308,22 @@ class FHeta(loader.Module):
     }
     
     def __init__(self) -> None:
-        self.fheta_cache: Dict[str, Dict[str, Any]] = {}
+        self.fheta_cache = FHetaCache(size=128, ttl=10800.0)
+        self.searches = FHetaCache(size=256, ttl=120.0, stale=600.0)
+        self.stats = FHetaCache(size=1024, ttl=30.0)
+        self.catalog = FHetaCatalog()
+        self.cataloged: Optional[bool] = None
+        self.metrics = FHetaMetrics()
+        self.editor = FHetaEditor(self.deliver)
+        self.flights: Dict[Tuple[str, bool, str], asyncio.Future] = {}
+        self.waiters: Dict[Tuple[str, bool, str], int] = {}
+        self.pending: Dict[Any, asyncio.Future] = {}
+        self.prerendered: Dict[Any, str] = {}
+        self.tasks: set = set()
+        self.syncs = {"checks": 0, "sent": 0}
+        self.timings: Dict[str, float] = {}
+        self.validation = asyncio.Lock()
+        self.checked = 0.0
         self.config = loader.ModuleConfig(
             loader.ConfigValue(
                 "only_official_developers",
@@ -550,33 +1342,55 @@ class FHeta(loader.Module):
                 "default",
                 lambda: self.strings["doctheme"],
                 validator=loader.validators.Choice(["default", "winter", "summer", "spring", "autumn"])
+            ),
+            loader.ConfigValue(
+                "search_debounce",
+                0.3,
+                lambda: self.strings["docdebounce"],
+                validator=loader.validators.Float(minimum=0, maximum=5)
+            ),
+            loader.ConfigValue(
+                "revalidate_interval",
+                24,
+                lambda: self.strings["docrevalidate"],
+                validator=loader.validators.Integer(minimum=0)
             )
         )
     
     async def on_unload(self) -> None:
+        for task in [*self.pending.values(), *self.flights.values(), *self.tasks]:
+            task.cancel()
         if hasattr(self, "api") and self.api.session and not self.api.session.closed:
             await self.api.session.close()
+        if hasattr(self, "logs"):
+            logging.getLogger().removeHandler(self.logs)
+        if hasattr(self, "installer"):
+            self.installer.cancel()
+        self.editor.cancel()
+        self.searches.clear()
+        self.stats.clear()
+        self.fheta_cache.clear()
         if hasattr(self, "inline") and hasattr(self.inline, "unregister_bot_update_handler"):
             self.inline.unregister_bot_update_handler("fheta_chosen")
             
     async def client_ready(self, client: 'telethon.TelegramClient', database: 'loader.Database') -> None:
-        await client(UnblockRequest("@FHeta_robot"))
-        await utils.dnd(client, "@FHeta_robot", archive=True)
-        
-        self.identifier = (await client.get_me()).id
+        started = time.perf_counter()
         self.token = database.get("FHeta", "token")
         
-        self.api = FHetaAPI()
+        self.api = FHetaAPI(metrics=self.metrics)
+        self.api.token = self.token
         self.ui = FHetaUI(self)
+        self.logs = FHetaLogs()
+        logging.getLogger().addHandler(self.logs)
+        self.installer = FHetaInstaller(self.download)
         
-        await self.request_join(
+        self.spawn(self.timed("warmup", self.api.warmup()))
+        self.unblock = self.spawn(self.timed("unblock", client(UnblockRequest("@FHeta_robot"))))
+        self.spawn(self.archive(client))
+        self.spawn(self.timed("join", self.request_join(
             "NFHeta_Updates",
             f"{self.ui.emoji('channel')} {self.strings['channel']}"
-        )
-        
-        self.api.token = self.token
-
-        self.fheta_cache: Dict[str, Dict[str, Any]] = {}
+        )))
 
         if hasattr(self.inline, "register_bot_update_handler"):
             async def fheta_chosen(event: Any) -> None:
@@ -584,146 +1398,439 @@ class FHeta(loader.Module):
                     await self.chosen(event)
             self.inline.register_bot_update_handler("fheta_chosen", "chosen_inline_result", fheta_chosen)
 
-        if self.token and not await self.api.fetch("validatetkn", user_id=str(self.identifier)):
-            self.token = None
-            self.api.token = None
+        self.identifier = getattr(client, "tg_id", None) or (await self.timed("get_me", client.get_me())).id
+        self.database = database
         
         if not self.token:
-            async with client.conversation("@FHeta_robot") as conversation:
-                await conversation.send_message('/token')
-                self.token = (await conversation.get_response(timeout=5)).text.strip()
-                database.set("FHeta", "token", self.token)
-                self.api.token = self.token
+            await asyncio.wait([self.unblock])
+            await self.timed("token", self.obtain(client))
+        elif time.time() - database.get("FHeta", "validated", 0) > self.config["revalidate_interval"] * 3600:
+            self.spawn(self.timed("validate", self.revalidate(True)))
+
+        self.timings["ready"] = round(time.perf_counter() - started, 3)
+        self.sync()
+
+    async def obtain(self, client: 'telethon.TelegramClient') -> None:
+        async with client.conversation("@FHeta_robot") as conversation:
+            await conversation.send_message('/token')
+            self.token = (await conversation.get_response(timeout=5)).text.strip()
+        self.api.token = self.token
+        self.database.set("FHeta", "token", self.token)
+        self.database.set("FHeta", "validated", time.time())
+
+    async def revalidate(self, force: bool = False) -> None:
+        if self.validation.locked() or (not force and time.monotonic() - self.checked < 60):
+            return
+        async with self.validation:
+            self.checked = time.monotonic()
+            try:
+                valid = self.token and await self.api.fetch("validatetkn", user_id=str(self.identifier))
+            except FHetaUnavailable:
+                return
+            except FHetaRejected:
+                valid = False
+            if valid:
+                self.database.set("FHeta", "validated", time.time())
+                return
+            self.token = None
+            self.api.token = None
+            await asyncio.wait([self.unblock])
+            await self.obtain(getattr(self, "client", self._client))
+
+    async def archive(self, client: 'telethon.TelegramClient') -> None:
+        await asyncio.wait([self.unblock])
+        await self.timed("dnd", utils.dnd(client, "@FHeta_robot", archive=True))
 
-    @loader.loop(interval=1, autostart=True)
+    async def timed(self, step: str, awaitable: Any) -> Any:
+        started = time.perf_counter()
+        try:
+            return await awaitable
+        finally:
+            self.timings[step] = round(time.perf_counter() - started, 3)
+
+    def sync(self) -> None:
+        self.syncs["checks"] += 1
+        lang = self.strings["lang"]
+        if lang != getattr(self, "_last_lang", None):
+            self._last_lang = lang
+            self.syncs["sent"] += 1
+            self.spawn(self.dataset(lang))
+
+    async def dataset(self, lang: str) -> None:
+        try:
+            await self.api.send("dataset", user_id=self.identifier, lang=lang)
+        except FHetaError:
+            self._last_lang = None
+
+    @loader.loop(interval=300, autostart=True)
     async def sync_loop(self):
-        cl = self.strings["lang"]
-        if cl != getattr(self, "_last_lang", None):
-            await self.api.send("dataset", user_id=self.identifier, lang=cl)
-            self._last_lang = cl
+        self.sync()
+
+    @loader.loop(interval=600, autostart=True)
+    async def catalog_loop(self):
+        if self.cataloged is False:
+            return
+        full = self.catalog.version is None
+        try:
+            snapshot = await self.api.fetch("catalog", **({} if full else {"since": self.catalog.version}))
+        except FHetaUnavailable:
+            return
+        except FHetaRejected as e:
+            if e.status in {404, 405, 410, 501}:
+                logger.debug("FHeta API does not serve catalog snapshots, searches will use the API")
+                self.cataloged = False
+            return
+        self.cataloged = True
+        if isinstance(snapshot, dict) and snapshot:
+            self.catalog.apply(snapshot, full)
+
+    def search_key(self, query: str) -> Tuple[str, bool, str]:
+        return query, bool(self.config["only_official_developers"]), self.strings["lang"]
+
+    async def search(self, query: str, inline: bool = False, debounce: float = 0.0) -> List[Dict[str, Any]]:
+        if self.catalog.version is not None and not self.config["only_official_developers"]:
+            modules = self.catalog.search(query)
+            if modules:
+                return modules
+                
+        key = self.search_key(query)
+        modules, fresh = self.searches.lookup(key)
+        if modules is not None:
+            self.spawn(self.prefetch(modules[:50]) if fresh else self.refresh(key, query, inline))
+            return modules
+        if debounce:
+            await asyncio.sleep(debounce)
+        return await self.refresh(key, query, inline)
+
+    async def refresh(self, key: Tuple[str, bool, str], query: str, inline: bool = False) -> List[Dict[str, Any]]:
+        flight = self.flights.get(key)
+        if flight is None:
+            flight = self.flights[key] = asyncio.ensure_future(self.remote(key, query, inline))
+            flight.add_done_callback(lambda task: self.flights.pop(key) if self.flights.get(key) is task else None)
+        self.waiters[key] = self.waiters.get(key, 0) + 1
+        try:
+            return await asyncio.shield(flight)
+        finally:
+            self.waiters[key] -= 1
+            if not self.waiters[key]:
+                del self.waiters[key]
+                if not flight.done():
+                    flight.cancel()
+                    if self.flights.get(key) is flight:
+                        del self.flights[key]
+
+    async def remote(self, key: Tuple[str, bool, str], query: str, inline: bool = False) -> List[Dict[str, Any]]:
+        try:
+            modules = await self.api.fetch("search", query=query, inline=str(inline).lower(), token=self.token, user_id=self.identifier, ood=str(self.config["only_official_developers"]).lower())
+        except FHetaRejected:
+            modules = None
+        if not modules or not isinstance(modules, list):
+            self.spawn(self.revalidate())
+            return []
+        self.searches.set(key, modules)
+        for data in modules[:50]:
+            self.stats.set(unquote(data.get("install", "")), {"likes": data.get("likes", 0), "dislikes": data.get("dislikes", 0)})
+        return modules
+
+    async def prefetch(self, modules: List[Dict[str, Any]]) -> None:
+        missing = [unquote(data.get("install", "")) for data in modules if self.stats.get(unquote(data.get("install", ""))) is None]
+        if not missing:
+            return
+        response = await self.api.send("get", payload=missing)
+        if not isinstance(response, dict):
+            return
+        for data in modules:
+            stats = response.get(unquote(data.get("install", "")))
+            if stats:
+                data.update(stats)
+                self.stats.set(unquote(data.get("install", "")), {"likes": data.get("likes", 0), "dislikes": data.get("dislikes", 0)})
+
+    def counts(self, data: Dict[str, Any]) -> Dict[str, int]:
+        return self.stats.get(unquote(data.get("install", ""))) or {"likes": data.get("likes", 0), "dislikes": data.get("dislikes", 0)}
 
     async def answer(self, callback: Any, text: Optional[str] = None, alert: bool = False) -> None:
         if not hasattr(callback, "answer"):
             return
         await callback.answer(text=text or "", show_alert=alert)
 
+    def markup(self, buttons: List[List[Dict[str, Any]]]) -> Any:
+        with self.metrics.measure("ui/markup"):
+            return self.inline.generate_markup(buttons)
+
     async def edit(self, target: Any, text: str, buttons: List[List[Dict[str, Any]]], banner: Optional[str] = None) -> None:
-        markup = self.inline.generate_markup(buttons)
+        inline_msg_id = getattr(target, "inline_message_id", None)
+        chat, message_id = (inline_msg_id, None) if inline_msg_id else (target.chat_id, target.message_id)
+        await self.editor.submit((self.identity(chat), message_id), (chat, message_id, text, buttons, banner))
+
+    @staticmethod
+    def identity(chat: Any) -> Any:
+        if not hasattr(chat, "access_hash"):
+            return chat
+        if hasattr(chat, "owner_id"):
+            packed = struct.pack("<iqiq", chat.dc_id, chat.owner_id, chat.id, chat.access_hash)
+        else:
+            packed = struct.pack("<iqq", chat.dc_id, chat.id, chat.access_hash)
+        return base64.urlsafe_b64encode(packed).decode().rstrip("=")
 
+    async def deliver(self, chat: Any, message_id: Optional[int], text: str, buttons: List[List[Dict[str, Any]]], banner: Optional[str] = None) -> None:
         if banner and banner not in text:
             text = f'<a href="{banner}">&#8204;</a>' + text
-        
-        inline_msg_id = target.inline_message_id if hasattr(target, "inline_message_id") else None
 
         await self.inline.bot.edit_message(
-            inline_msg_id or target.chat_id,
-            None if inline_msg_id else target.message_id,
+            chat,
+            message_id,
             text,
             parse_mode="HTML",
-            buttons=markup,
+            buttons=self.markup(buttons),
             link_preview=banner is not None,
             invert_media=banner is not None
         )
 
+    def register(self, modules: List[Dict[str, Any]], query: str) -> str:
+        set_id = str(uuid.uuid4())[:8]
+        self.fheta_cache.set(set_id, {"query": query, "mods": modules})
+        return set_id
+
+    def resolve(self, set_id: str) -> Optional[Tuple[List[Dict[str, Any]], str]]:
+        parent, _, view = set_id.partition(":")
+        saved = self.fheta_cache.get(parent)
+        if not saved:
+            return None
+        self.fheta_cache.set(parent, saved)
+        modules = saved["mods"]
+        if view:
+            modules = modules[int(view):int(view) + 1]
+        return (modules, saved["query"]) if modules else None
+
     async def chosen(self, event: Any) -> None:
         parts = getattr(event, "id", "").split("_")
         if len(parts) != 3:
             return
-        queryid, index = parts[1], int(parts[2])
-        saved = self.fheta_cache.get(queryid)
+        set_id = f"{parts[1]}:{int(parts[2])}"
+        with self.metrics.measure("ui/chosen"):
+            saved = self.resolve(set_id)
+            if not saved:
+                return
+            modules, query = saved
+            card = self.prepared(parts[1], int(parts[2]), modules[0]) or self.ui.card(modules[0], set_id, 0, 1, query)
+            await self.editor.submit((self.identity(event.msg_id), None), (event.msg_id, None, *card, modules[0].get("banner")))
+
+    def rendition(self, stats: Dict[str, int]) -> Tuple[Any, ...]:
+        return self.strings["lang"], self.get_prefix(), self.config["theme"], stats["likes"], stats["dislikes"]
+
+    def prepared(self, queryid: str, index: int, data: Dict[str, Any]) -> Optional[Tuple[str, List[List[Dict[str, Any]]]]]:
+        saved = self.fheta_cache.peek(queryid)
+        cards = saved.pop("cards", None) if saved else None
+        if not cards or index not in cards:
+            return None
+        rendition, card = cards[index]
+        return card if rendition == self.rendition(self.counts(data)) else None
+
+    def discard(self, queryid: Optional[str]) -> None:
+        saved = self.fheta_cache.peek(queryid) if queryid else None
+        if saved:
+            saved.pop("cards", None)
+
+    async def prerender(self, user: Any, queryid: str, modules: List[Dict[str, Any]], query: str) -> None:
+        saved = self.fheta_cache.peek(queryid)
         if not saved:
             return
-        query = saved.get("query", "")
-        modules = saved.get("mods", [])
-        if not modules or index >= len(modules):
-            return
-        data = modules[index]
-        text = self.ui.format(data, query, 1, 1, True)
-        buttons = self.ui.buttons(data.get("install", ""), data, 0, [data], query)
-        banner = data.get("banner")
-        if banner and banner not in text:
-            text = f'<a href="{banner}">&#8204;</a>' + text
-        await self.inline.bot.edit_message(
-            event.msg_id,
-            None,
-            text,
-            parse_mode="HTML",
-            buttons=self.inline.generate_markup(buttons),
-            link_preview=banner is not None,
-            invert_media=banner is not None
-        )
+        self.prerendered[user] = queryid
+        cards = saved["cards"] = {}
+        for index, data in enumerate(modules):
+            stats = self.stats.peek(unquote(data.get("install", ""))) or {"likes": data.get("likes", 0), "dislikes": data.get("dislikes", 0)}
+            view = f"{queryid}:{index}"
+            cards[index] = self.rendition(stats), (
+                self.ui.format(data, query, 1, 1, record=self.ui.record(data, view)),
+                self.ui.buttons(data, view, 0, 1, query, stats)
+            )
+            await asyncio.sleep(0)
+        await asyncio.sleep(60)
+        self.discard(queryid)
+        if self.prerendered.get(user) == queryid:
+            del self.prerendered[user]
 
-    async def show(self, callback: Any, index: int, modules: List[Dict[str, Any]], query: str) -> None:
+    async def show(self, callback: Any, set_id: str, index: int) -> None:
+        saved = self.resolve(set_id)
+        if not saved:
+            return await self.answer(callback, self.strings["expired"], True)
         await self.answer(callback)
         text = f"{self.ui.emoji('modules_list')} <b>{self.strings['list']}</b>"
-        await self.edit(callback, text, self.ui.pagination(modules, query, 0, index))
+        await self.edit(callback, text, self.ui.pagination(set_id, saved[0], 0, index))
 
-    async def page(self, callback: Any, current: int, modules: List[Dict[str, Any]], query: str, index: int) -> None:
+    async def page(self, callback: Any, set_id: str, current: int, index: int) -> None:
+        saved = self.resolve(set_id)
+        if not saved:
+            return await self.answer(callback, self.strings["expired"], True)
         await self.answer(callback)
         text = f"{self.ui.emoji('modules_list')} <b>{self.strings['list']}</b>"
-        await self.edit(callback, text, self.ui.pagination(modules, query, current, index))
+        await self.edit(callback, text, self.ui.pagination(set_id, saved[0], current, index))
 
-    async def navigate(self, callback: Any, index: int, modules: List[Dict[str, Any]], query: str = "") -> None:
+    async def navigate(self, callback: Any, set_id: str, index: int) -> None:
+        saved = self.resolve(set_id)
+        if not saved:
+            return await self.answer(callback, self.strings["expired"], True)
         await self.answer(callback)
+        modules, query = saved
         if 0 <= index < len(modules):
             data = modules[index]
-            text = self.ui.format(data, query, index + 1, len(modules))
-            buttons = self.ui.buttons(data.get('install', ''), data, index, modules, query)
+            text, buttons = self.ui.card(data, set_id, index, len(modules), query)
             await self.edit(callback, text, buttons, data.get("banner"))
 
-    async def rate(self, callback: Any, link: str, action: str, index: int, modules: Optional[List[Dict[str, Any]]], query: str = "") -> None:
-        response = await self.api.send(f"rate/{self.identifier}/{link}/{action}")
-        
-        request = await self.api.send("get", payload=[unquote(link)])
-        stats = request.get(unquote(link), {"likes": 0, "dislikes": 0})
+    async def rate(self, callback: Any, set_id: str, index: int, action: str) -> None:
+        saved = self.resolve(set_id)
+        if not saved or not 0 <= index < len(saved[0]):
+            return await self.answer(callback, self.strings["expired"], True)
+        modules, query = saved
+        data = modules[index]
+        link = data.get("install", "")
         
-        if modules and 0 <= index < len(modules):
-            modules[index].update(stats)
-            await self.edit(callback, self.ui.format(modules[index], query, index + 1, len(modules)), self.ui.buttons(link, stats, index, modules, query), modules[index].get("banner"))
+        try:
+            response = await self.api.send(f"rate/{self.identifier}/{link}/{action}")
+        except FHetaError:
+            return await self.answer(callback, self.strings["unavailable"], True)
+        if not response or not response.get("status"):
+            return
             
-        if response and response.get("status"):
-            status = response.get("status")
-            if status == "added":
-                text = self.strings["added"]
-            elif status == "changed":
-                text = self.strings["changed"]
-            elif status == "removed":
-                text = self.strings["deleted"]
-            else:
-                text = ""
-            await self.answer(callback, text, True)
-
-    def get_logs(self) -> str:
-        return "\n".join(
-            [
-                "\n".join(
-                    handler.dumps(0, client_id=getattr(self, "client", self._client).tg_id)
-                    if "client_id" in inspect.signature(handler.dumps).parameters
-                    else handler.dumps(0)
-                )
-                for handler in logging.getLogger().handlers
-                if hasattr(handler, "dumps")
-            ]
+        status = response.get("status")
+        if status == "added":
+            text = self.strings["added"]
+        elif status == "changed":
+            text = self.strings["changed"]
+        elif status == "removed":
+            text = self.strings["deleted"]
+        else:
+            text = ""
+            
+        self.tally(data, action, response)
+        self.stats.pop(unquote(link))
+        self.ui.invalidate(link)
+        await asyncio.gather(
+            self.edit(callback, *self.ui.card(data, set_id, index, len(modules), query), data.get("banner")),
+            self.answer(callback, text, True)
         )
+        self.spawn(self.reconcile(callback, set_id, index, modules, query))
+
+    def tally(self, data: Dict[str, Any], action: str, response: Dict[str, Any]) -> None:
+        if "likes" in response and "dislikes" in response:
+            data.update(likes=response["likes"], dislikes=response["dislikes"])
+            return
+        other = "dislikes" if action == "like" else "likes"
+        own, opposite = {"added": (1, 0), "changed": (1, -1), "removed": (-1, 0)}.get(response.get("status"), (0, 0))
+        data[f"{action}s"] = max(0, data.get(f"{action}s", 0) + own)
+        data[other] = max(0, data.get(other, 0) + opposite)
+
+    async def reconcile(self, callback: Any, set_id: str, index: int, modules: List[Dict[str, Any]], query: str) -> None:
+        data = modules[index]
+        link = data.get("install", "")
+        request = await self.api.send("get", payload=[unquote(link)])
+        stats = request.get(unquote(link))
+        if not stats or (stats.get("likes"), stats.get("dislikes")) == (data.get("likes"), data.get("dislikes")):
+            return
+        data.update(stats)
+        self.stats.set(unquote(link), {"likes": data.get("likes", 0), "dislikes": data.get("dislikes", 0)})
+        self.ui.invalidate(link)
+        await self.edit(callback, *self.ui.card(data, set_id, index, len(modules), query), data.get("banner"))
 
-    async def install(self, callback: Any, link: str, index: int, modules: Optional[List[Dict[str, Any]]], query: str = "") -> None:
-        ologs = self.get_logs()
+    def spawn(self, coro: Any) -> asyncio.Future:
+        task = asyncio.ensure_future(coro)
+        self.tasks.add(task)
+        task.add_done_callback(self.reap)
+        return task
+
+    def reap(self, task: asyncio.Future) -> None:
+        self.tasks.discard(task)
+        if not task.cancelled() and task.exception():
+            logger.debug("FHeta background task failed", exc_info=task.exception())
+
+    async def download(self, url: str) -> str:
+        with self.logs.capture() as records:
+            res = await self.lookup("loader").download_and_install(url)
+        return "success" if res == 1 else self.logs.classify(records)
+
+    async def install(self, callback: Any, set_id: str, index: int) -> None:
+        saved = self.resolve(set_id)
+        if not saved or not 0 <= index < len(saved[0]):
+            return await self.answer(callback, self.strings["expired"], True)
+        link = self.ui.url(saved[0][index].get("install", ""))
         
-        res = await self.lookup("loader").download_and_install(link)
+        if self.installer.status(link) in ("queued", "running"):
+            return await self.answer(callback, self.strings["installing"], True)
+            
+        outcome = await self.installer.submit(link)
+        await self.answer(callback, self.strings[outcome].format(deps=""), True)
+
+    async def install_all(self, callback: Any, set_id: str, current: int) -> None:
+        saved = self.resolve(set_id)
+        if not saved:
+            return await self.answer(callback, self.strings["expired"], True)
+        await self.answer(callback)
+        modules = saved[0]
+        names = "\n".join(
+            f"{index + 1}. <code>{record.name}</code> {self.strings['author']} <code>{record.author}</code>"
+            for index, data in enumerate(modules[:50])
+            for record in [self.ui.record(data, set_id, index)]
+        ) + ("\n..." if len(modules) > 50 else "")
+        text = f"{self.ui.emoji('warn')} <b>{self.strings['confirmall'].format(count=len(modules))}</b>\n<blockquote expandable>{names}</blockquote>"
+        await self.edit(callback, text, [
+            [{"text": self.strings["confirm"], "callback": self.install_confirmed, "args": (set_id, current)}],
+            [{"text": "✘", "callback": self.show, "args": (set_id, current)}]
+        ])
+
+    async def install_confirmed(self, callback: Any, set_id: str, current: int) -> None:
+        saved = self.resolve(set_id)
+        if not saved:
+            return await self.answer(callback, self.strings["expired"], True)
+        modules = saved[0]
+        await self.answer(callback, self.strings["bulk"].format(count=len(modules)))
+        report = await self.bulk([self.ui.url(data.get("install", "")) for data in modules])
+        await self.edit(callback, report, [[{"text": "✘", "callback": self.navigate, "args": (set_id, current)}]])
+
+    async def bulk(self, urls: List[str]) -> str:
+        started = time.perf_counter()
+        urls = list(dict.fromkeys(url for url in urls if url))
+        packages = self.scan(await asyncio.gather(*[self.api.raw(url) for url in urls]))
         
-        if res == 1:
-            await self.answer(callback, self.strings["success"], True)
-            return
+        report = []
+        if packages:
+            installed = time.perf_counter()
+            if await self.requirements(packages):
+                report.append(f"<i>{self.strings['bulkdeps'].format(count=len(packages), time=f'{time.perf_counter() - installed:.2f}')}</i>")
+            else:
+                report.append(f"<i>{self.strings['bulkdepsfail'].format(packages=utils.escape_html(' '.join(packages)))}</i>")
+            
+        async def job(url: str) -> Tuple[str, str, float]:
+            begun = time.perf_counter()
+            outcome = await self.installer.submit(url)
+            return url, outcome, time.perf_counter() - begun
+            
+        results = await asyncio.gather(*[job(url) for url in urls])
+        for url, outcome, elapsed in results:
+            name = utils.escape_html(url.rstrip("/").rsplit("/", 1)[-1])
+            report.append(f"<code>{name}</code> {elapsed:.2f}s — {self.strings[outcome].format(deps='')}")
+            
+        done = self.strings["bulkdone"].format(ok=sum(outcome == "success" for _, outcome, _ in results), total=len(urls), time=f"{time.perf_counter() - started:.2f}")
+        return f"{self.ui.emoji('module')} <b>{done}</b>\n<blockquote expandable>{chr(10).join(report)}</blockquote>"
 
-        alogs = self.get_logs()
-        nlogs = alogs[len(ologs):].lower()
+    def scan(self, sources: List[str]) -> List[str]:
+        return list(dict.fromkeys(
+            package
+            for source in sources
+            for line in loader.VALID_PIP_PACKAGES.findall(source)
+            for package in map(str.strip, line.split())
+            if package and not package.startswith(("-", "_", "."))
+        ))
 
-        if "overwrite" in nlogs:
-            await self.answer(callback, self.strings["overwrite"], True)
-        elif any(x in nlogs for x in ("requir", "depend", "package")):
-            await self.answer(callback, self.strings["dependency"].format(deps=""), True)
-        else:
-            await self.answer(callback, self.strings["error"], True)
+    async def requirements(self, packages: List[str]) -> bool:
+        process = await asyncio.create_subprocess_exec(
+            sys.executable, "-m", "pip", "install", "-q",
+            "--disable-pip-version-check", "--no-warn-script-location",
+            *(["--user"] if getattr(loader, "USER_INSTALL", False) else []),
+            *packages,
+            stdout=asyncio.subprocess.DEVNULL,
+            stderr=asyncio.subprocess.DEVNULL
+        )
+        return await process.wait() == 0
 
     @loader.inline_handler(
         ru_doc="(запрос) - поиск модулей.",
@@ -737,6 +1844,7 @@ class FHeta(loader.Module):
     async def fheta(self, event: 'loader.InlineCall') -> Union[Dict[str, str], None]:
         '''(query) - search modules.'''
         query = event.args
+        self.sync()
         
         if not query:
             return {
@@ -754,9 +1862,31 @@ class FHeta(loader.Module):
                 "thumb": "https://raw.githubusercontent.com/Fixyres/FModules/refs/heads/main/assets/FHeta/try_other_query.png"
             }
         
-        modules = await self.api.fetch("search", query=query, inline="true", token=self.token, user_id=self.identifier, ood=str(self.config["only_official_developers"]).lower())
+        user = getattr(getattr(getattr(event, "inline_query", None), "from_user", None), "id", None)
+        self.discard(self.prerendered.pop(user, None))
+        previous = self.pending.get(user)
+        if previous and not previous.done():
+            previous.cancel()
+            
+        task = self.pending[user] = asyncio.ensure_future(self.search(query, True, self.config["search_debounce"]))
+        try:
+            modules = await task
+        except asyncio.CancelledError:
+            if self.pending.get(user) is task:
+                raise
+            return None
+        except FHetaError:
+            return {
+                "title": self.strings["unavailable"],
+                "description": self.strings["hint"],
+                "message": f"{self.ui.emoji('warn')} <b>{self.strings['unavailable']}</b>",
+                "thumb": "https://raw.githubusercontent.com/Fixyres/FModules/refs/heads/main/assets/FHeta/try_other_query.png"
+            }
+        finally:
+            if self.pending.get(user) is task:
+                del self.pending[user]
         
-        if not modules or not isinstance(modules, list):
+        if not modules:
             return {
                 "title": self.strings["retry"],
                 "description": self.strings["hint"],
@@ -764,16 +1894,17 @@ class FHeta(loader.Module):
                 "thumb": "https://raw.githubusercontent.com/Fixyres/FModules/refs/heads/main/assets/FHeta/try_other_query.png"
             }
 
-        queryid = str(uuid.uuid4())[:8]
-        self.fheta_cache[queryid] = {"query": query, "mods": modules[:50]}
+        queryid = self.register(modules, query)
+        lazy = hasattr(self.inline, "register_bot_update_handler")
         results = []
         
         for index, data in enumerate(modules[:50]):
-            description = data.get("description", "")
-            if isinstance(description, dict):
-                description = description.get(self.strings["lang"]) or description.get("doc") or next(iter(description.values()), "")
+            record = self.ui.record(data, queryid, index)
             
-            markup = self.inline.generate_markup(self.ui.buttons(data.get("install", ""), data, index, modules, query))
+            if lazy:
+                markup = self.markup([[{"text": self.strings["code"], "url": self.ui.url(data.get("install", ""))}]])
+            else:
+                markup = self.markup(self.ui.buttons(data, queryid, index, len(modules), query))
                 
             thumb_url = data.get("pic") or "https://raw.githubusercontent.com/Fixyres/FModules/refs/heads/main/assets/FHeta/empty_pic.png"
             thumb = self.inline._web_document(thumb_url)
@@ -781,8 +1912,8 @@ class FHeta(loader.Module):
             results.append(
                 await event.builder.article(
                     id=f"fh_{queryid}_{index}",
-                    title=utils.escape_html(data.get("name", "")),
-                    description=utils.escape_html(str(description)[:250] + ("..." if len(str(description)) > 250 else "")),
+                    title=record.name,
+                    description=record.summary,
                     thumb=thumb,
                     text="🪐",
                     parse_mode="HTML",
@@ -791,6 +1922,8 @@ class FHeta(loader.Module):
             )
             
         await event.answer(results, cache_time=0)
+        if lazy:
+            self.spawn(self.prerender(user, queryid, modules[:5], query))
 
     @loader.command(
         ru_doc="(запрос) - поиск модулей.",
@@ -804,6 +1937,7 @@ class FHeta(loader.Module):
     async def fhetacmd(self, message: 'telethon.types.Message') -> Any:
         '''(query) - search modules.'''
         query = utils.get_args_raw(message)
+        self.sync()
         
         if not query:
             return await utils.answer(message, f"{self.ui.emoji('error')} <b>{self.strings['noquery'].format(prefix=f'<code>{self.get_prefix()}')}</code></b>")
@@ -813,29 +1947,99 @@ class FHeta(loader.Module):
 
         message = await utils.answer(message, f"{self.ui.emoji('search')} <b>{self.strings['search'].format(query=f'<code>{utils.escape_html(query)}</code>')}</b>")
         
-        modules = await self.api.fetch("search", query=query, inline="false", token=self.token, user_id=self.identifier, ood=str(self.config["only_official_developers"]).lower())
+        try:
+            modules = await self.search(query)
+        except FHetaError:
+            return await utils.answer(message, f"{self.ui.emoji('warn')} <b>{self.strings['unavailable']}</b>")
         
-        if not modules or not isinstance(modules, list):
+        if not modules:
             return await utils.answer(message, f"{self.ui.emoji('error')} <b>{self.strings['notfound'].format(query=f'<code>{utils.escape_html(query)}</code>')}</b>")
             
         data = modules[0]
-        buttons = self.ui.buttons(data.get("install", ""), data, 0, modules, query)
-        text = self.ui.format(data, query, 1, len(modules))
+        text, buttons = self.ui.card(data, self.register(modules, query), 0, len(modules), query)
         banner = data.get("banner")
         
         if banner and banner not in text:
             text = f'<a href="{banner}">&#8204;</a>' + text
             
+        inverted = banner is not None and "invert_media" in inspect.signature(self.inline.form).parameters
         msg = await self.inline.form(
             text,
             message,
             reply_markup=buttons,
-            silent=True
+            silent=True,
+            **({"invert_media": True} if inverted else {})
         )
         
-        if banner and msg:
-            await asyncio.sleep(0.4)
-            await self.edit(msg, text, buttons, banner)
+        if banner and msg and not inverted:
+            await self.attach(msg, text, buttons, banner)
+
+    async def attach(self, msg: Any, text: str, buttons: List[List[Dict[str, Any]]], banner: str) -> None:
+        for delay in (0.1, 0.2, 0.4):
+            try:
+                return await self.edit(msg, text, buttons, banner)
+            except Exception:
+                await asyncio.sleep(delay)
+        await self.edit(msg, text, buttons, banner)
+
+    @loader.command(
+        ru_doc="(ссылки) - установить несколько модулей сразу.",
+        ua_doc="(посилання) - встановити кілька модулів одразу.",
+        kz_doc="(сілтемелер) - бірнеше модульді бірден орнату.",
+        uz_doc="(havolalar) - bir nechta modulni birdaniga o'rnatish.",
+        fr_doc="(liens) - installer plusieurs modules à la fois.",
+        de_doc="(links) - mehrere Module auf einmal installieren.",
+        jp_doc="(リンク) - 複数のモジュールを一度にインストールします。"
+    )
+    async def fhinstallcmd(self, message: 'telethon.types.Message') -> Any:
+        '''(links) - install several modules at once.'''
+        urls = [self.ui.url(link) for link in utils.get_args_raw(message).split()]
+        
+        if not urls:
+            return await utils.answer(message, f"{self.ui.emoji('error')} <b>{self.strings['nolinks'].format(prefix=f'<code>{self.get_prefix()}')}</code></b>")
+            
+        message = await utils.answer(message, f"{self.ui.emoji('search')} <b>{self.strings['bulk'].format(count=len(set(urls)))}</b>")
+        await utils.answer(message, await self.bulk(urls))
+
+    @loader.command(
+        ru_doc="[reset] - статистика задержек и кэшей FHeta.",
+        ua_doc="[reset] - статистика затримок і кешів FHeta.",
+        kz_doc="[reset] - FHeta кідірістері мен кэштерінің статистикасы.",
+        uz_doc="[reset] - FHeta kechikishlari va keshlari statistikasi.",
+        fr_doc="[reset] - statistiques de latence et de cache de FHeta.",
+        de_doc="[reset] - Latenz- und Cache-Statistiken von FHeta.",
+        jp_doc="[reset] - FHetaの遅延とキャッシュの統計。"
+    )
+    async def fhstatscmd(self, message: 'telethon.types.Message') -> Any:
+        '''[reset] - FHeta latency and cache statistics.'''
+        if utils.get_args_raw(message).strip().lower() == "reset":
+            self.metrics.reset()
+            for cache in (self.fheta_cache, self.searches, self.stats, self.ui.cards):
+                cache.reset()
+            return await utils.answer(message, f"{self.ui.emoji('modules_list')} <b>{self.strings['metricsreset']}</b>")
+        await utils.answer(message, self.report())
+
+    def report(self) -> str:
+        groups: Dict[str, List[str]] = {}
+        for name, row in self.metrics.report().items():
+            group, _, label = name.partition("/")
+            groups.setdefault(group, []).append(
+                f"<code>{label}</code> {row['count']}× · p50 {row['p50'] * 1000:.1f} · p95 {row['p95'] * 1000:.1f} · p99 {row['p99'] * 1000:.1f} ms"
+                + (f" · ✘ {row['errors']}" if row["errors"] else "")
+                + (f" · {row['bytes'] / 1024:.1f} KB" if row["bytes"] else "")
+            )
+            
+        caches = {"results": self.fheta_cache, "searches": self.searches, "stats": self.stats, "cards": self.ui.cards}
+        lines = [f"<b>{group.upper()}</b>\n" + "\n".join(rows) for group, rows in groups.items()]
+        lines.append("<b>CACHE</b>\n" + "\n".join(
+            f"<code>{name}</code> {stats['size']}/{cache.size} · hits {stats['hits']} · misses {stats['misses']} · evictions {stats['evictions']}"
+            for name, cache in caches.items()
+            for stats in [cache.stats()]
+        ) + (f"\n<code>catalog</code> {len(self.catalog.records)}" if self.catalog.version is not None else ""))
+        lines.append("<b>POOL</b>\n" + " · ".join(f"{key} {value}" for key, value in self.api.stats().items()) + f"\ncircuit {'open' if self.api.breaker.opened is not None else 'closed'}")
+        lines.append("<b>SYNC</b>\n" + " · ".join(f"{key} {value}" for key, value in self.syncs.items()))
+        lines.append("<b>STARTUP</b>\n" + " · ".join(f"{key} {value}s" for key, value in self.timings.items()))
+        return f"{self.ui.emoji('modules_list')} <b>{self.strings['metrics']}</b>\n<blockquote expandable>{chr(10).join(lines)}</blockquote>"
 
     @loader.watcher(chat_id=7575472403)
     async def watcher(self, message: 'telethon.types.Message') -> None:
@@ -847,22 +2051,8 @@ class FHeta(loader.Module):
         if not url.startswith("https://api.fixyres.com/module/"):
             return
             
-        ologs = self.get_logs()
-        
-        res = await self.lookup("loader").download_and_install(url)
-        
-        if res == 1:
-            reply = await message.respond("✅")
-        else:
-            alogs = self.get_logs()
-            nlogs = alogs[len(ologs):].lower()
-            
-            if "overwrite" in nlogs:
-                reply = await message.respond("😨")
-            elif any(x in nlogs for x in ("requir", "depend", "package")):
-                reply = await message.respond("📋")
-            else:
-                reply = await message.respond("❌")
+        outcome = await self.installer.submit(url)
+        reply = await message.respond({"success": "✅", "overwrite": "😨", "dependency": "📋"}.get(outcome, "❌"))
                 
         await asyncio.sleep(1)
         await reply.delete()
@@ -0,0 +1,510 @@
+# ©️ Fixyres, 2024-2030
+# 🌐 https://github.com/Fixyres/FModules
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+# 🔑 http://www.apache.org/licenses/LICENSE-2.0
+
+# Offline checks and benchmarks for FHeta.py, run without a userbot:
+#   python bench_fheta.py render [--records 1500]
+#   python bench_fheta.py catalog [--sizes 1000 10000 100000]
+#   python bench_fheta.py e2e [--latency 50] [--modules 50] [--commands 10]
+
+import argparse
+import asyncio
+import gc
+import html
+import importlib.util
+import itertools
+import os
+import random
+import re
+import sys
+import time
+import tracemalloc
+import types
+from typing import Any, Dict, List
+
+
+def stub(name: str, **attributes: Any) -> types.ModuleType:
+    module = types.ModuleType(name)
+    module.__dict__.update(attributes)
+    sys.modules[name] = module
+    return module
+
+
+class Module:
+    strings: Dict[str, str] = {}
+
+    def get_prefix(self) -> str:
+        return "."
+
+    def lookup(self, name: str) -> Any:
+        return getattr(self, "lookups", {}).get(name)
+
+    async def request_join(self, *args: Any, **kwargs: Any) -> bool:
+        return True
+
+
+class ConfigValue:
+    def __init__(self, option: str, default: Any, doc: Any = None, validator: Any = None) -> None:
+        self.option = option
+        self.default = default
+
+
+class ModuleConfig(dict):
+    def __init__(self, *values: ConfigValue) -> None:
+        super().__init__({value.option: value.default for value in values})
+
+
+class Validators:
+    def __getattr__(self, name: str) -> Any:
+        return lambda *args, **kwargs: None
+
+
+def passthrough(*args: Any, **kwargs: Any) -> Any:
+    return lambda func: func
+
+
+def load() -> types.ModuleType:
+    if "fheta_bench.modules.FHeta" in sys.modules:
+        return sys.modules["fheta_bench.modules.FHeta"]
+
+    loader = stub(
+        "fheta_bench.loader",
+        Module=Module,
+        ConfigValue=ConfigValue,
+        ModuleConfig=ModuleConfig,
+        validators=Validators(),
+        tds=lambda cls: cls,
+        loop=passthrough,
+        command=passthrough,
+        inline_handler=passthrough,
+        watcher=passthrough,
+        InlineCall=object,
+        Database=object,
+        VALID_PIP_PACKAGES=re.compile(
+            r"^\s*# ?requires:(?: ?)((?:{url} )*(?:{url}))\s*$".format(url=r"[-[\]_.~:/?#@!$&'()*+,;%<>=a-zA-Z0-9]+"),
+            re.MULTILINE
+        )
+    )
+
+    async def answer(message: Any, text: str, **kwargs: Any) -> Any:
+        message.text = text
+        return message
+
+    async def dnd(*args: Any, **kwargs: Any) -> None:
+        pass
+
+    utils = stub(
+        "fheta_bench.utils",
+        escape_html=lambda text: html.escape(str(text), quote=False),
+        get_args_raw=lambda message: getattr(message, "args", ""),
+        answer=answer,
+        dnd=dnd
+    )
+    stub("fheta_bench", __path__=[], loader=loader, utils=utils)
+    stub("fheta_bench.modules", __path__=[])
+
+    for name in ("telethon", "herokutl", "herokutl.tl", "herokutl.tl.functions", "herokutl.tl.functions.contacts"):
+        try:
+            __import__(name)
+        except ImportError:
+            stub(name, __path__=[])
+    sys.modules["herokutl.tl.functions.contacts"].__dict__.setdefault("UnblockRequest", lambda peer: peer)
+    telethon = sys.modules["telethon"]
+    if not hasattr(telethon, "tl"):
+        telethon.tl = types.SimpleNamespace(types=types.SimpleNamespace(UpdateBotInlineSend=type("UpdateBotInlineSend", (), {})))
+
+    spec = importlib.util.spec_from_file_location(
+        "fheta_bench.modules.FHeta",
+        os.path.join(os.path.dirname(os.path.abspath(__file__)), "FHeta.py")
+    )
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[spec.name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+class Inline:
+    bot_username = "fheta_bench_bot"
+
+    def generate_markup(self, buttons: List[List[Dict[str, Any]]]) -> Any:
+        return [[dict(button) for button in row] for row in buttons]
+
+
+def instance(F: types.ModuleType) -> Any:
+    main = F.FHeta()
+    main.strings = dict(F.FHeta.strings)
+    main.inline = Inline()
+    main.identifier = 1
+    main.ui = F.FHetaUI(main)
+    return main
+
+
+def reference(main: Any, data: Dict[str, Any]) -> str:
+    escape = sys.modules["fheta_bench.utils"].escape_html
+    emoji = main.ui.emoji
+    limit = 3700
+
+    def render(items: List[Dict[str, Any]], kind: str, limit: int) -> str:
+        if not items:
+            return ""
+        lines: List[str] = []
+        title = "commands" if kind == "cmd" else "placeholders"
+        more = "morecommands" if kind == "cmd" else "moreplaceholders"
+        for index, item in enumerate(items):
+            description = item.get("description", {})
+            if isinstance(description, dict):
+                description = description.get(main.strings["lang"]) or description.get("doc") or ""
+            description = escape(description).split('\n')[0] if description else ""
+            name = escape(item.get("name", ""))
+            if item.get('inline'):
+                character, display_name = '@' + main.inline.bot_username + ' ', name
+            elif kind == "ph":
+                character, display_name = "", f"{{{name}}}"
+            else:
+                character, display_name = main.get_prefix(), name
+            row = f"<code>{character}{display_name}</code> {description}".strip()
+            extra = f"<i>{main.strings[more].format(remaining=len(items) - index)}</i>"
+            if len(re.sub(r'<[^>]+>', '', "\n".join(lines + [row, extra]))) > limit and index > 0:
+                lines.append(extra)
+                break
+            lines.append(row)
+        return f"\n\n{emoji('command' if kind == 'cmd' else 'placeholder')} <b>{main.strings[title]}:</b>\n<blockquote expandable>{chr(10).join(lines)}</blockquote>"
+
+    version = data.get("version", "?.?.?")
+    text = f"{emoji('module')} <code>{escape(data.get('name', ''))}</code> <b>{main.strings['author']}</b> <code>{escape(data.get('author', '???'))}</code>"
+    if version != "?.?.?":
+        text += f" (<code>v{version}</code>)"
+    description = data.get("description")
+    if description:
+        if isinstance(description, dict):
+            description = description.get(main.strings["lang"]) or description.get("doc") or next(iter(description.values()), "")
+        text += f"\n\n{emoji('description')} <b>{main.strings['description']}:</b>\n<blockquote expandable>{escape(str(description))}</blockquote>"
+    text += render(data.get("commands", []), "cmd", limit - len(re.sub(r'<[^>]+>', '', text)))
+    text += render(data.get("placeholders", []), "ph", limit - len(re.sub(r'<[^>]+>', '', text)))
+    return text
+
+
+def noise(rng: random.Random, size: int = 120) -> str:
+    return "".join(rng.choice("ab <>&\n\"'xyz é{}") for _ in range(rng.randint(0, size)))
+
+
+def module(index: int, commands: int, placeholders: int = 1) -> Dict[str, Any]:
+    return {
+        "name": f"Module{index}",
+        "author": "author<b>",
+        "version": "1.0.0",
+        "install": f"https://example.invalid/m{index}.py",
+        "likes": index,
+        "dislikes": 0,
+        "description": {"en": f"Description of module {index} & friends", "doc": "doc"},
+        "commands": [{"name": f"cmd{i}", "description": {"en": f"does <{i}>\nsecond line"}} for i in range(commands)],
+        "placeholders": [{"name": f"ph{i}", "description": "placeholder"} for i in range(placeholders)]
+    }
+
+
+def timeit(func: Any, repeat: int) -> float:
+    func()
+    started = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - started) / repeat * 1000
+
+
+def bench_render(args: argparse.Namespace) -> int:
+    F = load()
+    main = instance(F)
+    rng = random.Random(args.seed)
+    mismatches = 0
+    for trial in range(args.records):
+        data = {
+            "name": noise(rng),
+            "author": noise(rng),
+            "version": rng.choice(["?.?.?", "1.2"]),
+            "description": rng.choice([None, "", noise(rng), {"en": noise(rng)}, {"ru": noise(rng)}, {"doc": noise(rng) * 30}, {"en": ""}]),
+            "commands": [
+                {"name": noise(rng, 30), "inline": rng.random() < 0.2, "description": rng.choice([{"en": noise(rng)}, {"doc": noise(rng)}, noise(rng), {}])}
+                for _ in range(rng.choice([0, 1, 5, 30, 200]))
+            ],
+            "placeholders": [{"name": noise(rng, 30), "description": noise(rng)} for _ in range(rng.choice([0, 3, 100]))]
+        }
+        if main.ui.format(data) != reference(main, data):
+            mismatches += 1
+            print(f"mismatch in record {trial}")
+    print(f"render equivalence: {args.records - mismatches}/{args.records} records identical to the reference renderer")
+
+    print("commands  reference  format  format (record reused)")
+    for count in (10, 100, 1000):
+        data = module(0, count)
+        record = F.FHetaModule(data, main.strings["lang"])
+        print(f"{count:>8}  {timeit(lambda: reference(main, data), args.repeat):7.3f} ms  {timeit(lambda: main.ui.format(data), args.repeat):6.3f} ms  {timeit(lambda: main.ui.format(data, record=record), args.repeat):6.3f} ms")
+    return 1 if mismatches else 0
+
+
+def bench_catalog(args: argparse.Namespace) -> int:
+    F = load()
+    rng = random.Random(args.seed)
+    vocabulary = ["".join(rng.choice("abcdefghijklmnopqrstuvwxyz") for _ in range(rng.randint(3, 10))) for _ in range(20000)]
+    weights = list(itertools.accumulate(1 / (rank + 1) for rank in range(len(vocabulary))))
+
+    def word() -> str:
+        return rng.choices(vocabulary, cum_weights=weights)[0]
+
+    def record(index: int) -> Dict[str, Any]:
+        return {
+            "name": f"{word()}{index % 97}",
+            "author": word(),
+            "install": f"https://example.invalid/{index}.py",
+            "likes": rng.randint(0, 50),
+            "description": {"en": " ".join(word() for _ in range(15))},
+            "commands": [{"name": word(), "description": {"en": " ".join(word() for _ in range(6))}} for _ in range(rng.randint(1, 8))]
+        }
+
+    print("records    build    index memory  query p50  query p95  query max")
+    for size in args.sizes:
+        modules = [record(index) for index in range(size)]
+        gc.collect()
+        tracemalloc.start()
+        catalog = F.FHetaCatalog()
+        catalog.apply({"version": 1, "modules": modules}, True)
+        memory = tracemalloc.get_traced_memory()[0] / 2 ** 20
+        tracemalloc.stop()
+        del catalog
+        gc.collect()
+
+        started = time.perf_counter()
+        catalog = F.FHetaCatalog()
+        catalog.apply({"version": 1, "modules": modules}, True)
+        build = time.perf_counter() - started
+
+        queries = [" ".join(word() for _ in range(rng.randint(1, 3))) for _ in range(args.queries)]
+        queries += [query[:-1] + "x" for query in queries[:args.queries // 2]] + [query[:3] for query in queries[:args.queries // 2]]
+        latencies = []
+        for query in queries:
+            started = time.perf_counter()
+            catalog.search(query)
+            latencies.append((time.perf_counter() - started) * 1000)
+        latencies.sort()
+        print(f"{size:>7}  {build:6.2f} s  {memory:9.1f} MiB  {latencies[len(latencies) // 2]:6.2f} ms  {latencies[int(len(latencies) * 0.95)]:6.2f} ms  {latencies[-1]:6.1f} ms")
+    return 0
+
+
+class Bot:
+    def __init__(self, latency: float) -> None:
+        self.latency = latency
+        self.edits = 0
+
+    async def edit_message(self, *args: Any, **kwargs: Any) -> None:
+        await asyncio.sleep(self.latency)
+        self.edits += 1
+
+
+class BenchInline(Inline):
+    def __init__(self, latency: float) -> None:
+        self.bot = Bot(latency)
+
+    def _web_document(self, url: str) -> str:
+        return url
+
+    async def form(self, text: str, message: Any, reply_markup: Any = None, silent: bool = False) -> Any:
+        await asyncio.sleep(self.bot.latency)
+        return types.SimpleNamespace(inline_message_id=f"form{id(message)}")
+
+
+class Builder:
+    async def article(self, **kwargs: Any) -> Dict[str, Any]:
+        return kwargs
+
+
+class InlineEvent:
+    def __init__(self, query: str) -> None:
+        self.args = query
+        self.builder = Builder()
+        self.inline_query = types.SimpleNamespace(from_user=types.SimpleNamespace(id=1))
+
+    async def answer(self, results: List[Dict[str, Any]], cache_time: int = 0) -> None:
+        self.results = results
+
+
+class Call:
+    def __init__(self) -> None:
+        self.inline_message_id = "call"
+
+    async def answer(self, text: str = "", show_alert: bool = False) -> None:
+        pass
+
+
+class Client:
+    tg_id = 1
+
+    async def __call__(self, request: Any) -> None:
+        pass
+
+
+class Database(dict):
+    def get(self, owner: str, key: str, default: Any = None) -> Any:
+        return super().get((owner, key), default)
+
+    def set(self, owner: str, key: str, value: Any) -> None:
+        self[(owner, key)] = value
+
+
+class Loader:
+    def __init__(self, session: Any) -> None:
+        self.session = session
+
+    async def download_and_install(self, url: str) -> int:
+        async with self.session.get(url) as response:
+            await response.read()
+        return 1
+
+
+def server(args: argparse.Namespace) -> Any:
+    from aiohttp import web
+
+    delay = args.latency / 1000
+    state: Dict[str, Any] = {}
+
+    def results(query: str) -> List[Dict[str, Any]]:
+        return [
+            {**module(index, args.commands), "name": f"{query}{index}", "install": f"{state['base']}module/{query}{index}.py"}
+            for index in range(args.modules)
+        ]
+
+    @web.middleware
+    async def latency(request: Any, handler: Any) -> Any:
+        await asyncio.sleep(delay)
+        return await handler(request)
+
+    async def search(request: Any) -> Any:
+        return web.json_response(results(request.query.get("query", "")))
+
+    async def rate(request: Any) -> Any:
+        return web.json_response({"status": "added"})
+
+    async def stats(request: Any) -> Any:
+        return web.json_response({link: {"likes": 1, "dislikes": 0} for link in await request.json()})
+
+    async def ok(request: Any) -> Any:
+        return web.json_response({"ok": True})
+
+    async def source(request: Any) -> Any:
+        return web.Response(text="# requires: \nfrom .. import loader\n" + "#" * args.payload)
+
+    app = web.Application(middlewares=[latency])
+    app.router.add_get("/search", search)
+    app.router.add_post("/rate/{tail:.*}", rate)
+    app.router.add_post("/get", stats)
+    app.router.add_route("*", "/validatetkn", ok)
+    app.router.add_route("*", "/dataset", ok)
+    app.router.add_get("/module/{name}", source)
+    app.router.add_route("HEAD", "/", ok)
+    return app, state
+
+
+def percentile(samples: List[float], q: float) -> float:
+    return sorted(samples)[min(len(samples) - 1, int(len(samples) * q))]
+
+
+async def scenarios(args: argparse.Namespace) -> None:
+    from aiohttp import web
+
+    F = load()
+    app, state = server(args)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    state["base"] = f"http://127.0.0.1:{site._server.sockets[0].getsockname()[1]}/"
+
+    main = instance(F)
+    main.inline = BenchInline(args.edit / 1000)
+    main.config["search_debounce"] = args.debounce
+    database = Database({("FHeta", "token"): "bench", ("FHeta", "validated"): time.time()})
+    api = F.FHetaAPI
+    F.FHetaAPI = lambda **kwargs: api(base=state["base"], **kwargs)
+    await main.client_ready(Client(), database)
+    F.FHetaAPI = api
+    main.lookups = {"loader": Loader(await main.api.connect())}
+
+    set_id = main.register(await main.search("navigate"), "navigate")
+    counter = itertools.count()
+
+    async def inline() -> None:
+        await main.fheta(InlineEvent(f"inline{next(counter)}"))
+
+    async def command() -> None:
+        await main.fhetacmd(types.SimpleNamespace(args=f"command{next(counter)}"))
+
+    async def navigate() -> None:
+        await main.navigate(Call(), set_id, next(counter) % args.modules)
+
+    async def rate() -> None:
+        await main.rate(Call(), set_id, next(counter) % args.modules, "like")
+
+    async def install() -> None:
+        await main.install(Call(), main.register(await main.search(f"install{next(counter)}"), "install"), 0)
+
+    print(f"api latency {args.latency} ms, edit latency {args.edit} ms, {args.modules} modules x {args.commands} commands per search, base {state['base']}")
+    print("scenario    p50 ms   p95 ms   max ms   alloc KiB/op   peak KiB")
+    for name, scenario in (("inline", inline), ("fhetacmd", command), ("navigate", navigate), ("rate", rate), ("install", install)):
+        latencies = []
+        for _ in range(args.runs):
+            started = time.perf_counter()
+            await scenario()
+            latencies.append((time.perf_counter() - started) * 1000)
+        await asyncio.gather(*main.tasks, return_exceptions=True)
+
+        gc.collect()
+        tracemalloc.start()
+        before = tracemalloc.get_traced_memory()[0]
+        for _ in range(args.runs):
+            await scenario()
+        await asyncio.gather(*main.tasks, return_exceptions=True)
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        print(f"{name:<10} {percentile(latencies, 0.5):7.2f}  {percentile(latencies, 0.95):7.2f}  {max(latencies):7.2f}  {(current - before) / args.runs / 1024:13.1f}  {(peak - before) / 1024:9.1f}")
+
+    print(re.sub(r"<[^>]+>", "", main.report().replace("<blockquote expandable>", "\n")))
+    await main.on_unload()
+    await runner.cleanup()
+
+
+def bench_e2e(args: argparse.Namespace) -> int:
+    asyncio.run(scenarios(args))
+    return 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Offline checks and benchmarks for FHeta.py")
+    parser.add_argument("--seed", type=int, default=1)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    render = commands.add_parser("render", help="FHetaUI.format equivalence against the reference renderer and command-count micro-benchmark")
+    render.add_argument("--records", type=int, default=1500)
+    render.add_argument("--repeat", type=int, default=50)
+    render.set_defaults(run=bench_render)
+
+    catalog = commands.add_parser("catalog", help="FHetaCatalog build time, index memory and query latency on Zipf-distributed synthetic catalogs")
+    catalog.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    catalog.add_argument("--queries", type=int, default=100)
+    catalog.set_defaults(run=bench_catalog)
+
+    e2e = commands.add_parser("e2e", help="End-to-end latency and allocations of inline search, fhetacmd, navigate, rate and install against a local stand-in API")
+    e2e.add_argument("--latency", type=float, default=50.0, help="stand-in API latency, ms")
+    e2e.add_argument("--edit", type=float, default=0.0, help="simulated Telegram edit latency, ms")
+    e2e.add_argument("--modules", type=int, default=50, help="modules per search response")
+    e2e.add_argument("--commands", type=int, default=10, help="commands per module")
+    e2e.add_argument("--payload", type=int, default=20000, help="module source size, bytes")
+    e2e.add_argument("--debounce", type=float, default=0.0, help="search_debounce, s (module default is 0.3)")
+    e2e.add_argument("--runs", type=int, default=30)
+    e2e.set_defaults(run=bench_e2e)
+
+    args = parser.parse_args()
+    return args.run(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())